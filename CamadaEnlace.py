@@ -1,215 +1,1358 @@
 import binascii
+import bisect
+import itertools
+import json
+import os
+import re
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
 from bitarray import bitarray
 
+
+def _para_bits(dados):
+    # Aceita bitarray, texto de '0'/'1' ou bytes/bytearray/memoryview e devolve um bitarray
+    if isinstance(dados, bitarray):
+        return dados
+    if isinstance(dados, str):
+        return bitarray(dados)
+    bits = bitarray()
+    bits.frombytes(dados)
+    return bits
+
+
+def _completar(bits, multiplo=8):
+    # Completa até o próximo múltiplo (por padrão, o próximo byte) com um bit 1 seguido de zeros
+    # (sempre há pelo menos o bit 1), para o receptor saber exatamente onde os dados terminam
+    return bits + bitarray("1" + "0" * ((-len(bits) - 1) % multiplo))
+
+
+def _remover_complemento(bits):
+    # Remove o complemento: os zeros finais e o bit 1 que os antecede
+    fim = bits.find(1, right=True)
+    if fim < 0:
+        raise ValueError("Quadro sem o complemento de bits")
+    return bits[:fim]
+
+
+def _bits_para_array(bits):
+    # bitarray -> array uint8 de 0/1 (os bitarrays daqui usam a ordem padrão, MSB primeiro)
+    return np.unpackbits(np.frombuffer(bits.tobytes(), dtype=np.uint8), count=len(bits))
+
+
+def _array_para_bits(array):
+    array = np.asarray(array, dtype=np.uint8).reshape(-1)
+    bits = bitarray()
+    bits.frombytes(np.packbits(array).tobytes())
+    del bits[len(array):]
+    return bits
+
+
+def _bytes_de(bits, nome):
+    # Delimitador/escape de 1 byte usados na inserção de bytes
+    bits = _para_bits(bits)
+    if len(bits) != 8:
+        raise ValueError(f"O {nome} deve ter 8 bits (recebido {len(bits)})")
+    return bits.tobytes()
+
+
+def _escapar_bytes(dados, flag, esc):
+    # Inserção de bytes: o escape vai antes de cada byte igual ao delimitador ou ao escape.
+    # Duas passadas de bytes.replace, lineares no tamanho; os escapes são tratados primeiro
+    # para não escapar os que acabaram de ser inseridos
+    return dados.replace(esc, esc + esc).replace(flag, esc + flag)
+
+
+def _desescapar_bytes(dados, esc):
+    # Remove cada escape e mantém o byte seguinte literalmente, numa única passada da expressão regular
+    return re.sub(re.escape(esc) + b"(.)", rb"\1", dados, flags=re.DOTALL)
+
+
+def _fim_sequencias_de_uns(bits, tamanho):
+    # Índices onde termina cada grupo de `tamanho` uns consecutivos, sem laço em Python: as bordas das
+    # sequências de uns saem da diferença do array, e cada sequência longa gera comprimento // tamanho índices
+    bordas = np.diff(bits, prepend=np.uint8(0), append=np.uint8(0)).view(np.int8)
+    inicios = np.flatnonzero(bordas == 1)
+    comprimentos = np.flatnonzero(bordas == -1) - inicios
+    grupos = comprimentos // tamanho
+    longas = grupos > 0
+    inicios, grupos = inicios[longas], grupos[longas]
+    # Posição de cada grupo dentro da sua sequência: 0, 1, ..., grupos-1
+    ordem = np.arange(grupos.sum()) - np.repeat(np.cumsum(grupos) - grupos, grupos)
+    return np.repeat(inicios, grupos) + (ordem + 1) * tamanho - 1
+
+
+def _inserir_zeros(bits):
+    # Inserção de bits do HDLC: um 0 depois de cada cinco 1 seguidos, para o delimitador 01111110
+    # nunca aparecer nos dados. Depois do 0 inserido a contagem recomeça, por isso basta achar
+    # os múltiplos de 5 em cada sequência de uns
+    array = _bits_para_array(bits)
+    return _array_para_bits(np.insert(array, _fim_sequencias_de_uns(array, 5) + 1, 0))
+
+
+def _remover_zeros(bits):
+    # Remove o 0 que segue cada cinco 1 seguidos
+    array = _bits_para_array(bits)
+    inseridos = _fim_sequencias_de_uns(array, 5) + 1
+    inseridos = inseridos[inseridos < len(array)]
+    if array[inseridos].any():
+        raise ValueError("Seis bits 1 seguidos dentro do quadro")
+    return _array_para_bits(np.delete(array, inseridos))
+
+
+class CRC:
+    """ CRC por tabela com atualização incremental: crc.update(pedaco) quantas vezes for preciso e crc.valor.
+
+    O CRC-32 usa o zlib.crc32 e o CRC-16/CCITT o binascii.crc_hqx (ambos em C, continuando do valor
+    anterior); os demais usam slicing-by-8, que processa 8 bytes por iteração com 8 tabelas de 256 entradas
+    """
+    # Nome -> (largura em bits, polinômio, valor inicial, refletido, xor final)
+    TIPOS = {
+        "CRC-8": (8, 0x07, 0x00, False, 0x00),
+        "CRC-16/CCITT": (16, 0x1021, 0xFFFF, False, 0x0000),
+        "CRC-32": (32, 0x04C11DB7, 0xFFFFFFFF, True, 0xFFFFFFFF),
+        "CRC-32C": (32, 0x1EDC6F41, 0xFFFFFFFF, True, 0xFFFFFFFF),
+    }
+
+    # Tabelas de slicing-by-8 por nome, calculadas uma única vez
+    _tabelas = {}
+
+    def __init__(self, nome="CRC-32"):
+        if nome not in self.TIPOS:
+            raise ValueError(f"CRC desconhecido: {nome}")
+        self.nome = nome
+        self.largura, self.polinomio, self.inicial, self.refletido, self.xor_final = self.TIPOS[nome]
+        self.mascara = (1 << self.largura) - 1
+        if nome == "CRC-32":
+            self._atualizar = zlib.crc32
+        elif nome == "CRC-16/CCITT":
+            self._atualizar = binascii.crc_hqx
+        else:
+            if nome not in self._tabelas:
+                self._tabelas[nome] = self._gerar_tabelas()
+            self._atualizar = self._slicing_by_8
+        self.reset()
+
+    def reset(self):
+        self.valor = self.inicial ^ self.xor_final
+        return self
+
+    def update(self, pedaco):
+        """ Continua o CRC com mais bytes (bytes, bytearray ou memoryview) """
+        self.valor = self._atualizar(pedaco, self.valor)
+        return self
+
+    def calcular(self, dados):
+        """ CRC de uma mensagem inteira, sem alterar o valor acumulado """
+        return self._atualizar(dados, self.inicial ^ self.xor_final)
+
+    def _gerar_tabelas(self):
+        # Tabela 0: CRC de cada byte sozinho. Tabela k: efeito do byte seguido de k bytes nulos
+        tabela = []
+        for byte in range(256):
+            if self.refletido:
+                polinomio = int(f"{self.polinomio:0{self.largura}b}"[::-1], 2)
+                registro = byte
+                for _ in range(8):
+                    registro = (registro >> 1) ^ (polinomio if registro & 1 else 0)
+            else:
+                registro = byte << (self.largura - 8)
+                bit_alto = 1 << (self.largura - 1)
+                for _ in range(8):
+                    registro = ((registro << 1) ^ (self.polinomio if registro & bit_alto else 0)) & self.mascara
+            tabela.append(registro)
+        tabelas = [tabela]
+        for _ in range(7):
+            anterior = tabelas[-1]
+            if self.refletido:
+                tabelas.append([(v >> 8) ^ tabela[v & 0xFF] for v in anterior])
+            else:
+                tabelas.append([((v << 8) & self.mascara) ^ tabela[v >> (self.largura - 8)] for v in anterior])
+        return tabelas
+
+    def _slicing_by_8(self, dados, valor):
+        t0, t1, t2, t3, t4, t5, t6, t7 = self._tabelas[self.nome]
+        dados = memoryview(dados).cast("B")
+        registro = valor ^ self.xor_final
+        inteiros = len(dados) - len(dados) % 8
+        if self.refletido:
+            # O registro entra nos bytes menos significativos da palavra de 64 bits (little-endian,
+            # explícito para não depender da ordem de bytes da máquina)
+            for palavra in np.frombuffer(dados[:inteiros], dtype="<u8").tolist():
+                v = registro ^ palavra
+                registro = (t7[v & 0xFF] ^ t6[(v >> 8) & 0xFF] ^ t5[(v >> 16) & 0xFF] ^ t4[(v >> 24) & 0xFF]
+                            ^ t3[(v >> 32) & 0xFF] ^ t2[(v >> 40) & 0xFF] ^ t1[(v >> 48) & 0xFF] ^ t0[v >> 56])
+            for byte in dados[inteiros:]:
+                registro = (registro >> 8) ^ t0[(registro ^ byte) & 0xFF]
+        else:
+            # O registro entra nos bytes mais significativos da palavra de 64 bits (big-endian)
+            deslocamento = 64 - self.largura
+            for inicio in range(0, inteiros, 8):
+                v = int.from_bytes(dados[inicio:inicio + 8], "big") ^ (registro << deslocamento)
+                registro = (t7[v >> 56] ^ t6[(v >> 48) & 0xFF] ^ t5[(v >> 40) & 0xFF] ^ t4[(v >> 32) & 0xFF]
+                            ^ t3[(v >> 24) & 0xFF] ^ t2[(v >> 16) & 0xFF] ^ t1[(v >> 8) & 0xFF] ^ t0[v & 0xFF])
+            for byte in dados[inteiros:]:
+                registro = ((registro << 8) & self.mascara) ^ t0[(registro >> (self.largura - 8)) ^ byte]
+        return registro ^ self.xor_final
+
+
+# Formatos do cabeçalho da contagem de bytes -> bytes do campo de tamanho (None: varint, de 1 a 10 bytes)
+FORMATOS_CABECALHO = {"8": 1, "16": 2, "32": 4, "varint": None}
+_MAX_BYTES_VARINT = 10
+
+
+def _codificar_cabecalho(tamanho, formato="8", protecao=None):
+    # Tamanho do payload em bytes -> cabeçalho (big-endian, ou varint de 7 bits por byte, o menos
+    # significativo primeiro), seguido do CRC do próprio cabeçalho quando protecao é o nome de um CRC
+    if formato not in FORMATOS_CABECALHO:
+        raise ValueError(f"Formato de cabeçalho desconhecido: {formato}")
+    num_bytes = FORMATOS_CABECALHO[formato]
+    if num_bytes is None:
+        cabecalho = bytearray()
+        while True:
+            cabecalho.append((tamanho & 0x7F) | (0x80 if tamanho > 0x7F else 0))
+            tamanho >>= 7
+            if not tamanho:
+                break
+    else:
+        if tamanho >> (8 * num_bytes):
+            raise ValueError(f"Payload de {tamanho} bytes não cabe no cabeçalho de {formato} bits")
+        cabecalho = tamanho.to_bytes(num_bytes, "big")
+    if protecao is not None:
+        crc = CRC(protecao)
+        cabecalho = bytes(cabecalho) + crc.calcular(cabecalho).to_bytes(crc.largura // 8, "big")
+    return bytes(cabecalho)
+
+
+def _ler_cabecalho(dados, inicio=0, formato="8", protecao=None):
+    # Lê o cabeçalho que começa em dados[inicio]: devolve (tamanho do payload, posição do payload),
+    # ou None se o cabeçalho ainda não chegou inteiro. Um CRC de cabeçalho errado gera ValueError
+    if formato not in FORMATOS_CABECALHO:
+        raise ValueError(f"Formato de cabeçalho desconhecido: {formato}")
+    num_bytes = FORMATOS_CABECALHO[formato]
+    if num_bytes is None:
+        tamanho, posicao = 0, inicio
+        while True:
+            if posicao >= len(dados):
+                return None
+            byte = dados[posicao]
+            tamanho |= (byte & 0x7F) << (7 * (posicao - inicio))
+            posicao += 1
+            if not byte & 0x80:
+                break
+            if posicao - inicio == _MAX_BYTES_VARINT:
+                raise ValueError("Cabeçalho varint longo demais")
+    else:
+        posicao = inicio + num_bytes
+        if posicao > len(dados):
+            return None
+        tamanho = int.from_bytes(dados[inicio:posicao], "big")
+    if protecao is not None:
+        crc = CRC(protecao)
+        fim = posicao + crc.largura // 8
+        if fim > len(dados):
+            return None
+        if crc.calcular(dados[inicio:posicao]) != int.from_bytes(dados[posicao:fim], "big"):
+            raise ValueError(f"Cabeçalho corrompido ({protecao} inválido)")
+        posicao = fim
+    return tamanho, posicao
+
+
+class CodigoHamming:
+    # Códigos de Hamming em blocos. Nome -> (n, k, bit extra de paridade global).
+    # O SECDED(72,64) é o Hamming(71,64) (encurtado do (127,120)) mais a paridade da palavra inteira:
+    # corrige 1 erro e detecta 2 erros por bloco
+    TIPOS = {
+        "Hamming(7,4)": (7, 4, False),
+        "Hamming(15,11)": (15, 11, False),
+        "SECDED(72,64)": (72, 64, True),
+    }
+
+    def __init__(self, nome="Hamming(7,4)"):
+        if nome not in self.TIPOS:
+            raise ValueError(f"Código de Hamming desconhecido: {nome}")
+        self.nome = nome
+        self.n, self.k, self.secded = self.TIPOS[nome]
+
+        # Palavra de Hamming com posições 1..n_hamming: paridades nas potências de 2, dados no resto
+        n_hamming = self.n - self.secded
+        posicoes = np.arange(1, n_hamming + 1)
+        self.num_paridades = n_hamming - self.k
+        self.posicoes_dados = np.flatnonzero((posicoes & (posicoes - 1)) != 0)
+
+        # Matriz de verificação (n x r): a linha de cada posição tem os bits do número da posição,
+        # e a coluna extra do SECDED soma a palavra inteira
+        bits_posicao = (posicoes[:, np.newaxis] >> np.arange(self.num_paridades)) & 1
+        if self.secded:
+            bits_posicao = np.vstack([bits_posicao, np.zeros((1, self.num_paridades), dtype=bits_posicao.dtype)])
+            bits_posicao = np.hstack([bits_posicao, np.ones((self.n, 1), dtype=bits_posicao.dtype)])
+        self.verificacao = bits_posicao.astype(np.uint8)
+
+        # Matriz geradora (k x n): cada bit de dados entra na sua posição e em todas as paridades
+        # que cobrem essa posição; no SECDED a última coluna é a paridade da linha
+        self.geradora = np.zeros((self.k, self.n), dtype=np.uint8)
+        self.geradora[np.arange(self.k), self.posicoes_dados] = 1
+        self.geradora[:, (1 << np.arange(self.num_paridades)) - 1] = bits_posicao[self.posicoes_dados,
+                                                                                 :self.num_paridades]
+        if self.secded:
+            self.geradora[:, -1] = self.geradora[:, :-1].sum(axis=1) & 1
+
+        self.tabela_sindromes = self._tabela_sindromes()
+
+    def _tabela_sindromes(self):
+        # Síndrome (como inteiro) -> coluna a inverter; n significa "sem erro" e -1 "erro não corrigível"
+        num_sindromes = 1 << self.verificacao.shape[1]
+        tabela = np.full(num_sindromes, -1, dtype=np.intp)
+        tabela[0] = self.n
+        # Erro simples em cada coluna: a síndrome é a linha da matriz de verificação
+        # (nos códigos perfeitos (7,4) e (15,11) isso cobre todas as síndromes). No SECDED, síndrome
+        # não nula com paridade global correta é erro duplo, e posições além de n_hamming são erros múltiplos
+        tabela[self.verificacao @ (1 << np.arange(self.verificacao.shape[1]))] = np.arange(self.n)
+        return tabela
+
+    def codificar_blocos(self, blocos):
+        # Matriz (blocos, k) de bits -> matriz (blocos, n) de palavras, num único produto de matrizes
+        return (np.asarray(blocos, dtype=np.uint8) @ self.geradora) & 1
+
+    def decodificar_blocos(self, palavras):
+        # Matriz (blocos, n) de palavras -> matriz (blocos, k) de dados corrigidos
+        return self.corrigir_blocos(palavras)[0]
+
+    def corrigir_blocos(self, palavras):
+        # Como decodificar_blocos, mas também devolve quantos blocos tinham um erro corrigido
+        palavras = np.asarray(palavras, dtype=np.uint8)
+        bits_sindrome = (palavras @ self.verificacao) & 1
+        sindromes = bits_sindrome @ (1 << np.arange(self.verificacao.shape[1]))
+        colunas = self.tabela_sindromes[sindromes]
+        if (colunas < 0).any():
+            raise ValueError(f"Erro duplo detectado no quadro ({self.nome})")
+
+        # Uma coluna extra absorve os blocos sem erro (coluna n); as outras recebem a inversão do bit
+        corrigidas = np.hstack([palavras, np.zeros((len(palavras), 1), dtype=np.uint8)])
+        corrigidas[np.arange(len(palavras)), colunas] ^= 1
+        return corrigidas[:, self.posicoes_dados], int(np.count_nonzero(colunas < self.n))
+
+    def codificar(self, bits):
+        """ Completa os bits até um múltiplo de k e codifica todos os blocos de uma vez """
+        blocos = _bits_para_array(_completar(_para_bits(bits), self.k)).reshape(-1, self.k)
+        return _array_para_bits(self.codificar_blocos(blocos))
+
+    def decodificar(self, bits):
+        """ Corrige e decodifica todos os blocos de uma vez e remove o complemento """
+        return self.corrigir(bits)[0]
+
+    def corrigir(self, bits):
+        """ Como decodificar, mas devolve (bits, número de blocos corrigidos) """
+        bits = _para_bits(bits)
+        if len(bits) % self.n:
+            raise ValueError(f"Tamanho {len(bits)} não é múltiplo do bloco de {self.n} bits ({self.nome})")
+        dados, corrigidos = self.corrigir_blocos(_bits_para_array(bits).reshape(-1, self.n))
+        return _remover_complemento(_array_para_bits(dados)), corrigidos
+
+
+# Aritmética em GF(256) com o polinômio primitivo x^8 + x^4 + x^3 + x^2 + 1 (0x11D) e α = 2.
+# _GF_EXP tem 510 entradas para que log(a) + log(b) dispense o módulo 255
+def _tabelas_gf():
+    exp = np.zeros(510, dtype=np.intp)
+    log = np.zeros(256, dtype=np.intp)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        x <<= 1
+        if x & 0x100:
+            x ^= 0x11D
+    exp[255:] = exp[:255]
+    # Tabela de multiplicação completa (256 x 256), para multiplicar matrizes de símbolos por indexação
+    mul = exp[log[:, np.newaxis] + log[np.newaxis, :]].astype(np.uint8)
+    mul[0, :] = mul[:, 0] = 0
+    return exp, log, mul
+
+
+_GF_EXP, _GF_LOG, _GF_MUL = _tabelas_gf()
+_EXP, _LOG = _GF_EXP.tolist(), _GF_LOG.tolist()
+
+
+def _gf_mul(a, b):
+    return _EXP[_LOG[a] + _LOG[b]] if a and b else 0
+
+
+def _gf_div(a, b):
+    return _EXP[_LOG[a] - _LOG[b] + 255] if a else 0
+
+
+def _gf_avaliar(polinomio, x):
+    # Horner; coeficientes do termo de maior grau para o de menor
+    valor = 0
+    for coeficiente in polinomio:
+        valor = _gf_mul(valor, x) ^ coeficiente
+    return valor
+
+
+class CodigoReedSolomon:
+    """ Reed-Solomon sistemático sobre GF(256) (símbolos de 1 byte), corrigindo até (n - k) / 2 bytes por bloco.
+
+    Os dados são divididos em blocos de k bytes e cada bloco recebe n - k bytes de paridade; o último
+    bloco é encurtado (menos de k bytes de dados, tratados como precedidos de zeros). A codificação e as
+    síndromes são calculadas para todos os blocos de uma vez, por tabelas; só os blocos com síndrome não
+    nula passam por Berlekamp-Massey, busca de Chien e Forney
+    """
+    # Nome -> (n, k)
+    TIPOS = {
+        "RS(255,223)": (255, 223),
+        "RS(255,239)": (255, 239),
+    }
+    # Blocos processados por vez nas tabelas (limita as matrizes intermediárias a alguns MB)
+    BLOCOS_POR_LOTE = 1024
+
+    # Tabelas de paridade e de síndromes por nome, calculadas uma única vez
+    _tabelas = {}
+
+    def __init__(self, nome="RS(255,223)"):
+        if nome not in self.TIPOS:
+            raise ValueError(f"Código Reed-Solomon desconhecido: {nome}")
+        self.nome = nome
+        self.n, self.k = self.TIPOS[nome]
+        self.num_paridades = self.n - self.k
+        self.capacidade = self.num_paridades // 2
+        if nome not in self._tabelas:
+            self._tabelas[nome] = self._gerar_tabelas()
+        self.tabela_paridade, self.tabela_sindromes = self._tabelas[nome]
+
+    def _gerar_tabelas(self):
+        # Polinômio gerador g(x) = (x - α^0)(x - α^1)...(x - α^(n-k-1)), do maior grau para o menor
+        geradora = [1]
+        for j in range(self.num_paridades):
+            geradora = [a ^ _gf_mul(b, _EXP[j]) for a, b in zip(geradora + [0], [0] + geradora)]
+
+        # Paridade de cada byte de dados sozinho (valor 1): x^grau mod g(x), com o grau do byte i
+        # sendo n - 1 - i. Começa em x^(n-k) mod g(x) e multiplica por x a cada grau acima
+        unitarias = np.zeros((self.k, self.num_paridades), dtype=np.uint8)
+        resto = geradora[1:]
+        for i in range(self.k - 1, -1, -1):
+            unitarias[i] = resto
+            topo = resto[0]
+            resto = [a ^ _gf_mul(topo, b) for a, b in zip(resto[1:] + [0], geradora[1:])]
+
+        # Pela linearidade, a paridade do bloco é o XOR de valor * paridade unitária de cada byte:
+        # tabela_paridade[i, v] é essa contribuição para o byte i com valor v
+        valores = np.arange(256)[np.newaxis, :, np.newaxis]
+        tabela_paridade = _GF_MUL[valores, unitarias[:, np.newaxis, :]]
+
+        # Síndrome j = r(α^j): o byte i com valor v contribui v * α^(j * (n - 1 - i))
+        graus = self.n - 1 - np.arange(self.n)
+        potencias = _GF_EXP[(graus[:, np.newaxis] * np.arange(self.num_paridades)) % 255]
+        tabela_sindromes = _GF_MUL[valores, potencias[:, np.newaxis, :]]
+        return tabela_paridade, tabela_sindromes
+
+    def _somar_tabela(self, tabela, blocos):
+        # XOR das linhas tabela[i, blocos[:, i]] de cada bloco, em lotes de BLOCOS_POR_LOTE
+        resultado = np.empty((len(blocos), tabela.shape[2]), dtype=np.uint8)
+        posicoes = np.arange(blocos.shape[1])
+        for inicio in range(0, len(blocos), self.BLOCOS_POR_LOTE):
+            lote = blocos[inicio:inicio + self.BLOCOS_POR_LOTE]
+            resultado[inicio:inicio + len(lote)] = np.bitwise_xor.reduce(tabela[posicoes, lote], axis=1)
+        return resultado
+
+    def codificar_blocos(self, blocos):
+        # Matriz (blocos, k) de bytes -> matriz (blocos, n) de palavras: dados seguidos da paridade
+        blocos = np.asarray(blocos, dtype=np.uint8)
+        return np.hstack([blocos, self._somar_tabela(self.tabela_paridade, blocos)])
+
+    def sindromes_blocos(self, palavras):
+        # Matriz (blocos, n) de palavras -> matriz (blocos, n - k) de síndromes (todas nulas sem erro)
+        return self._somar_tabela(self.tabela_sindromes, np.asarray(palavras, dtype=np.uint8))
+
+    def corrigir_blocos(self, palavras, encurtamento=None):
+        """ Corrige a matriz (blocos, n) de palavras e devolve (dados (blocos, k), bytes corrigidos).
+
+        encurtamento[b] é o número de zeros implícitos no início do bloco b (bloco encurtado);
+        um erro nessas posições, ou mais erros do que a capacidade do código, gera ValueError
+        """
+        palavras = np.array(palavras, dtype=np.uint8)
+        sindromes = self.sindromes_blocos(palavras)
+        corrigidos = 0
+        for bloco in np.flatnonzero(sindromes.any(axis=1)):
+            inicio_valido = 0 if encurtamento is None else int(encurtamento[bloco])
+            posicoes, valores = self._localizar_erros(sindromes[bloco].tolist(), inicio_valido)
+            palavras[bloco, posicoes] ^= valores
+            corrigidos += len(posicoes)
+
+        # Confirma que as palavras corrigidas são palavras do código
+        if corrigidos and self.sindromes_blocos(palavras).any():
+            raise ValueError(f"Erros demais para corrigir no quadro ({self.nome})")
+        return palavras[:, :self.k], corrigidos
+
+    def _localizar_erros(self, sindromes, inicio_valido):
+        # Berlekamp-Massey: polinômio localizador Λ(x), do menor grau para o maior
+        localizador, anterior = [1], [1]
+        num_erros, passo, discrepancia_anterior = 0, 1, 1
+        for n, sindrome in enumerate(sindromes):
+            discrepancia = sindrome
+            for i in range(1, min(num_erros + 1, len(localizador))):
+                discrepancia ^= _gf_mul(localizador[i], sindromes[n - i])
+            if discrepancia == 0:
+                passo += 1
+                continue
+            fator = _gf_div(discrepancia, discrepancia_anterior)
+            novo = localizador + [0] * max(len(anterior) + passo - len(localizador), 0)
+            for i, coeficiente in enumerate(anterior):
+                novo[i + passo] ^= _gf_mul(fator, coeficiente)
+            if 2 * num_erros <= n:
+                anterior, num_erros, discrepancia_anterior, passo = localizador, n + 1 - num_erros, discrepancia, 1
+            else:
+                passo += 1
+            localizador = novo
+        localizador = localizador[:num_erros + 1]
+        if num_erros > self.capacidade:
+            raise ValueError(f"Erros demais para corrigir no quadro ({self.nome})")
+
+        # Busca de Chien, vetorizada: o byte de grau e tem erro se Λ(α^-e) = 0
+        graus = np.arange(self.n)
+        termos = np.zeros((num_erros + 1, self.n), dtype=np.intp)
+        for t, coeficiente in enumerate(localizador):
+            if coeficiente:
+                termos[t] = _GF_EXP[(_LOG[coeficiente] - graus * t) % 255]
+        graus_erro = graus[np.bitwise_xor.reduce(termos, axis=0) == 0]
+        posicoes = self.n - 1 - graus_erro
+        if len(posicoes) != num_erros or (posicoes < inicio_valido).any():
+            raise ValueError(f"Erros demais para corrigir no quadro ({self.nome})")
+
+        # Forney (primeira raiz α^0): valor = X * Ω(X^-1) / Λ'(X^-1), com Ω(x) = S(x)Λ(x) mod x^(n-k)
+        avaliador = [0] * self.num_paridades
+        for i, sindrome in enumerate(sindromes):
+            for t, coeficiente in enumerate(localizador[:self.num_paridades - i]):
+                avaliador[i + t] ^= _gf_mul(sindrome, coeficiente)
+        # Em característica 2, a derivada só mantém os termos de grau ímpar
+        derivada = [coeficiente if t % 2 else 0 for t, coeficiente in enumerate(localizador)][1:]
+        valores = []
+        for grau in graus_erro.tolist():
+            x = _EXP[grau]
+            x_inverso = _EXP[(255 - grau) % 255]
+            omega = _gf_avaliar(avaliador[::-1], x_inverso)
+            denominador = _gf_avaliar(derivada[::-1], x_inverso)
+            if denominador == 0:
+                raise ValueError(f"Erros demais para corrigir no quadro ({self.nome})")
+            valores.append(_gf_mul(x, _gf_div(omega, denominador)))
+        return posicoes, np.array(valores, dtype=np.uint8)
+
+    def codificar(self, bits):
+        """ Completa os bits até o fim do byte e codifica todos os blocos; o último bloco é encurtado """
+        dados = np.frombuffer(_completar(_para_bits(bits)).tobytes(), dtype=np.uint8)
+        num_blocos = -(-len(dados) // self.k)
+
+        # O último bloco recebe zeros à esquerda, que não mudam a paridade e não são transmitidos
+        encurtamento = num_blocos * self.k - len(dados)
+        blocos = np.concatenate([dados[:len(dados) - len(dados) % self.k],
+                                 np.zeros(encurtamento, dtype=np.uint8),
+                                 dados[len(dados) - len(dados) % self.k:]]).reshape(-1, self.k)
+        palavras = self.codificar_blocos(blocos).reshape(-1)
+        if encurtamento:
+            ultimo = (num_blocos - 1) * self.n
+            palavras = np.delete(palavras, np.s_[ultimo:ultimo + encurtamento])
+        return _para_bits(palavras.tobytes())
+
+    def decodificar(self, bits):
+        """ Corrige e decodifica todos os blocos de uma vez e remove o complemento """
+        return self.corrigir(bits)[0]
+
+    def corrigir(self, bits):
+        """ Como decodificar, mas devolve (bits, número de bytes corrigidos) """
+        bits = _para_bits(bits)
+        ultimo = len(bits) // 8 % self.n
+        if len(bits) % 8 or not bits or 0 < ultimo <= self.num_paridades:
+            raise ValueError(f"Tamanho {len(bits)} inválido para blocos de {self.n} bytes ({self.nome})")
+        palavras = np.frombuffer(bits.tobytes(), dtype=np.uint8)
+
+        # Devolve ao último bloco encurtado os zeros implícitos do início
+        encurtamento = np.zeros(-(-len(palavras) // self.n), dtype=np.intp)
+        if ultimo:
+            encurtamento[-1] = self.n - ultimo
+            inicio = len(palavras) - ultimo
+            palavras = np.concatenate([palavras[:inicio], np.zeros(self.n - ultimo, dtype=np.uint8),
+                                       palavras[inicio:]])
+        dados, corrigidos = self.corrigir_blocos(palavras.reshape(-1, self.n), encurtamento)
+        dados = dados.reshape(-1)
+        if ultimo:
+            inicio = (len(encurtamento) - 1) * self.k
+            dados = np.delete(dados, np.s_[inicio:inicio + encurtamento[-1]])
+        return _remover_complemento(_para_bits(dados.tobytes())), corrigidos
+
+
+class Entrelacador:
+    """ Entrelaçador de bloco por bytes, com profundidade configurável.
+
+    Os bytes do quadro são escritos linha a linha numa matriz de `profundidade` linhas e lidos coluna a
+    coluna (a última linha pode ficar incompleta, sem complemento). Uma rajada de b bytes no canal
+    atinge no máximo ceil(b / profundidade) bytes seguidos de cada linha; com palavras Reed-Solomon de
+    capacidade t, rajadas de até profundidade * t bytes são corrigidas
+    """
+    # Nome em detection_correction: "Entrelaçamento(profundidade)"
+    PADRAO_NOME = re.compile(r"Entrelaçamento\((\d+)\)")
+
+    def __init__(self, profundidade=8):
+        if profundidade < 1:
+            raise ValueError(f"Profundidade de entrelaçamento inválida: {profundidade}")
+        self.profundidade = profundidade
+
+    @classmethod
+    def do_nome(cls, nome):
+        """ Entrelacador para um nome "Entrelaçamento(profundidade)", ou None se o nome for outro """
+        encontrado = cls.PADRAO_NOME.fullmatch(nome) if isinstance(nome, str) else None
+        return cls(int(encontrado.group(1))) if encontrado else None
+
+    def _ordem(self, tamanho):
+        # Índices de entrada na ordem de saída: a matriz é completada com -1, transposta e os -1 removidos
+        colunas = -(-tamanho // self.profundidade)
+        matriz = np.full(self.profundidade * colunas, -1, dtype=np.intp)
+        matriz[:tamanho] = np.arange(tamanho)
+        ordem = matriz.reshape(self.profundidade, colunas).T.reshape(-1)
+        return ordem[ordem >= 0]
+
+    def _bytes(self, bits):
+        bits = _para_bits(bits)
+        if len(bits) % 8:
+            raise ValueError(f"Tamanho {len(bits)} não é múltiplo de 8 bits (entrelaçamento)")
+        return np.frombuffer(bits.tobytes(), dtype=np.uint8)
+
+    def entrelacar(self, bits):
+        """ Permuta os bytes (o número de bits deve ser múltiplo de 8) """
+        dados = self._bytes(bits)
+        return _para_bits(dados[self._ordem(len(dados))].tobytes())
+
+    def desentrelacar(self, bits):
+        """ Desfaz entrelacar """
+        dados = self._bytes(bits)
+        saida = np.empty_like(dados)
+        saida[self._ordem(len(dados))] = dados
+        return _para_bits(saida.tobytes())
+
+
+class Instrumentacao:
+    """ Contadores e tempos por etapa da camada de enlace, no lugar dos print() de depuração.
+
+    Os contadores (quadros, bytes, falhas de CRC/paridade, correções de Hamming...) ficam em
+    `contadores`; cada etapa medida guarda contagem, total, mínimo, máximo e um histograma de
+    tempos em escala logarítmica. rastreio=True mostra o conteúdo de cada etapa (como os antigos
+    print()), enviado para `destino` (print por padrão; pode ser, por exemplo, logging.debug).
+    Uma CamadaEnlace sem instrumentação não mede nada nem monta mensagens
+    """
+    # Limites superiores (em segundos) das faixas do histograma; a última faixa fica acima de 1 s
+    LIMITES_HISTOGRAMA = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+    def __init__(self, rastreio=False, destino=print):
+        self.rastreio = rastreio
+        self.destino = destino
+        self.reset()
+
+    def reset(self):
+        self.contadores = Counter()
+        self.tempos = {}
+
+    def contar(self, nome, quantidade=1):
+        self.contadores[nome] += quantidade
+
+    def registrar_tempo(self, etapa, segundos):
+        tempo = self.tempos.get(etapa)
+        if tempo is None:
+            tempo = self.tempos[etapa] = {"contagem": 0, "total_s": 0.0, "min_s": segundos, "max_s": segundos,
+                                          "histograma": [0] * (len(self.LIMITES_HISTOGRAMA) + 1)}
+        tempo["contagem"] += 1
+        tempo["total_s"] += segundos
+        tempo["min_s"] = min(tempo["min_s"], segundos)
+        tempo["max_s"] = max(tempo["max_s"], segundos)
+        tempo["histograma"][bisect.bisect_left(self.LIMITES_HISTOGRAMA, segundos)] += 1
+
+    def rastrear(self, mensagem, bits):
+        if self.rastreio:
+            self.destino(f"{mensagem}: {bits.to01()}")
+
+    def snapshot(self):
+        """ Cópia dos contadores e dos tempos em um dict simples (serializável em JSON) """
+        return {
+            "contadores": dict(self.contadores),
+            "tempos": {etapa: dict(tempo, histograma=list(tempo["histograma"]))
+                       for etapa, tempo in self.tempos.items()},
+            "limites_histograma_s": list(self.LIMITES_HISTOGRAMA),
+        }
+
+    def mesclar(self, snapshot):
+        """ Soma os contadores e os tempos de um snapshot (ex.: vindo de outro processo) aos deste """
+        self.contadores.update(snapshot["contadores"])
+        for etapa, outro in snapshot["tempos"].items():
+            tempo = self.tempos.get(etapa)
+            if tempo is None:
+                self.tempos[etapa] = dict(outro, histograma=list(outro["histograma"]))
+                continue
+            tempo["contagem"] += outro["contagem"]
+            tempo["total_s"] += outro["total_s"]
+            tempo["min_s"] = min(tempo["min_s"], outro["min_s"])
+            tempo["max_s"] = max(tempo["max_s"], outro["max_s"])
+            tempo["histograma"] = [a + b for a, b in zip(tempo["histograma"], outro["histograma"])]
+
+    def exportar_json(self, caminho=None):
+        """ Snapshot em JSON; também grava em `caminho` quando ele é dado """
+        texto = json.dumps(self.snapshot(), indent=2)
+        if caminho is not None:
+            with open(caminho, "w") as arquivo:
+                arquivo.write(texto)
+        return texto
+
+
 class CamadaEnlace:
-    def __init__(self, detection_correction):
+    def __init__(self, detection_correction, instrumentacao=None):
+        # Instrumentacao opcional (contadores, tempos por etapa e rastreio); None não custa nada
+        self.instrumentacao = instrumentacao
+        self.detection_correction = tuple(detection_correction)
         self.detection_methods = []
+        self.detection_names = []
         self.detection_size = 0
         for method in detection_correction:
             if method == "Paridade":
                 self.detection_methods.append(self.adicionar_paridade)
+                self.detection_names.append(method)
                 self.detection_size += 8
-            elif method == "CRC-32":
-                self.detection_methods.append(self.adicionar_crc)
-                self.detection_size += 32
+            elif method in CRC.TIPOS:
+                self.detection_methods.append(partial(self.adicionar_crc, tipo=method))
+                self.detection_names.append(method)
+                self.detection_size += CRC.TIPOS[method][0]
         self.hamming_enabled = "Hamming" in detection_correction
 
-    # Transmissão
-    def enquadrar_contagem(self, dados, tamanho_maximo):
+        # Hamming em blocos (um código por quadro), aplicado depois da detecção; depois dele o
+        # Reed-Solomon e, por último, sobre o quadro já completado até o byte, o entrelaçamento
+        self.codigo_bloco = None
+        self.reed_solomon = None
+        self.entrelacador = None
+        for method in detection_correction:
+            if method in CodigoHamming.TIPOS:
+                self.codigo_bloco = CodigoHamming(method)
+            elif method in CodigoReedSolomon.TIPOS:
+                self.reed_solomon = CodigoReedSolomon(method)
+            elif Entrelacador.do_nome(method) is not None:
+                self.entrelacador = Entrelacador.do_nome(method)
+
+    # Transmissão.
+    # Os métodos *_bits trabalham com bitarray e os *_bytes com bytes/memoryview, sem passar por texto;
+    # os métodos originais recebem e devolvem textos de '0'/'1' e apenas convertem para os *_bits
+    def enquadrar_contagem(self, dados, tamanho_maximo, cabecalho="8", protecao_cabecalho=None):
         """ Realiza enquadramento utilizando contagem de bytes """
+        quadros = self.enquadrar_contagem_bits(bitarray(dados), tamanho_maximo, cabecalho, protecao_cabecalho)
+        return [quadro.to01() for quadro in quadros]
+
+    def enquadrar_contagem_bytes(self, dados, tamanho_maximo, cabecalho="8", protecao_cabecalho=None):
+        """ Enquadramento por contagem de bytes; tamanho_maximo em bytes e quadros em bytes """
+        quadros = self.enquadrar_contagem_bits(_para_bits(dados), 8 * tamanho_maximo, cabecalho, protecao_cabecalho)
+        return [quadro.tobytes() for quadro in quadros]
+
+    def enquadrar_contagem_bits(self, dados, tamanho_maximo, cabecalho="8", protecao_cabecalho=None):
+        """ Enquadramento por contagem de bytes; tamanho_maximo em bits e quadros em bitarray.
+
+        cabecalho escolhe o campo de tamanho: "8", "16" ou "32" bits, ou "varint" (1 byte até 127 bytes
+        de payload, sem limite prático); protecao_cabecalho (ex.: "CRC-8") acrescenta um CRC só do
+        cabeçalho, para um tamanho corrompido não ser usado
+        """
         quadros = []
-        while dados:
-            payload = dados[:tamanho_maximo]
-            dados = dados[tamanho_maximo:]
-            print("Payload original:", payload)
-            for method in self.detection_methods:
-                payload = method(payload)
-                print("Após método de detecção:", payload)
-            if self.hamming_enabled:
-                payload = self.codificar_hamming(payload)
-                print("Após Hamming:", payload)
-            
-            # Calcula o tamanho do payload em bytes (arredondando para cima)
-            tamanho_bytes = (len(payload) + 7) // 8  # Arredonda para cima
-            quadro = f"{tamanho_bytes:08b}" + payload
-            print("Quadro final:", quadro)
-            quadros.append(quadro)
+        for payload in self._dividir(_para_bits(dados), tamanho_maximo):
+            payload = self._codificar_payload(payload)
+
+            # O payload codificado ocupa um número inteiro de bytes
+            cabecalho_bits = self._etapa("enquadrar.cabecalho", self._montar_cabecalho,
+                                         len(payload) // 8, cabecalho, protecao_cabecalho)
+            quadros.append(self._quadro_pronto(cabecalho_bits + payload))
         return quadros
 
-    def enquadrar_insercao(self, dados, tamanho_maximo, delimitador="01111110", escape="00100011"):
+    def _montar_cabecalho(self, tamanho_bytes, cabecalho, protecao_cabecalho):
+        return _para_bits(_codificar_cabecalho(tamanho_bytes, cabecalho, protecao_cabecalho))
+
+    def enquadrar_insercao(self, dados, tamanho_maximo, delimitador="01111110", escape="00100011", modo="byte"):
         """ Realiza enquadramento utilizando inserção de flags """
+        quadros = self.enquadrar_insercao_bits(bitarray(dados), tamanho_maximo, delimitador, escape, modo)
+        return [quadro.to01() for quadro in quadros]
+
+    def enquadrar_insercao_bytes(self, dados, tamanho_maximo, delimitador="01111110", escape="00100011",
+                                 modo="byte"):
+        """ Enquadramento por inserção de flags; tamanho_maximo em bytes e quadros em bytes """
+        quadros = self.enquadrar_insercao_bits(_para_bits(dados), 8 * tamanho_maximo, delimitador, escape, modo)
+        return [quadro.tobytes() for quadro in quadros]
+
+    def enquadrar_insercao_bits(self, dados, tamanho_maximo, delimitador="01111110", escape="00100011",
+                                modo="byte"):
+        """ Enquadramento por inserção de flags; tamanho_maximo em bits e quadros em bitarray.
+
+        modo="byte" insere o escape antes dos bytes iguais ao delimitador ou ao escape;
+        modo="bit" faz a inserção de bits do HDLC (um 0 depois de cinco 1 seguidos) e ignora o escape.
+        A inserção é feita por último, sobre o payload já codificado, para que nem os bits de
+        detecção e correção formem um delimitador dentro do quadro
+        """
+        flag = _para_bits(delimitador)
         quadros = []
-        while dados:
-            payload = dados[:tamanho_maximo]
-            dados = dados[tamanho_maximo:]
-            escaped_payload = ""
-            for byte in [payload[i:i+8] for i in range(0, len(payload), 8)]:
-                if byte in [delimitador, escape]:
-                    escaped_payload += escape
-                escaped_payload += byte
-            for method in self.detection_methods:
-                escaped_payload = method(escaped_payload)
-            if self.hamming_enabled:
-                escaped_payload = self.codificar_hamming(escaped_payload)
-            quadro = delimitador + escaped_payload + delimitador
-            quadros.append(quadro)
+        for payload in self._dividir(_para_bits(dados), tamanho_maximo):
+            payload = self._codificar_payload(payload)
+            inserido = self._etapa("enquadrar.insercao", self._inserir, payload, delimitador, escape, modo)
+            quadros.append(self._quadro_pronto(flag + inserido + flag))
         return quadros
 
+    # Instrumentação: sem Instrumentacao, cada etapa é só uma chamada a mais
+    def _etapa(self, nome, funcao, *args):
+        instrumentacao = self.instrumentacao
+        if instrumentacao is None:
+            return funcao(*args)
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        instrumentacao.registrar_tempo(nome, time.perf_counter() - inicio)
+        return resultado
+
+    def _contar(self, nome, quantidade=1):
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar(nome, quantidade)
+
+    def _dividir(self, dados, tamanho_maximo):
+        # Payloads de até tamanho_maximo bits
+        return self._etapa("enquadrar.divisao", lambda: [dados[inicio:inicio + tamanho_maximo]
+                                                         for inicio in range(0, len(dados), tamanho_maximo)])
+
+    def _quadro_pronto(self, quadro):
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar("quadros_enviados")
+            self.instrumentacao.contar("bytes_enviados", (len(quadro) + 7) // 8)
+            self.instrumentacao.rastrear("Quadro final", quadro)
+        return quadro
+
+    def _inserir(self, payload, delimitador, escape, modo):
+        if modo == "byte":
+            flag, esc = _bytes_de(delimitador, "delimitador"), _bytes_de(escape, "escape")
+            return _para_bits(_escapar_bytes(payload.tobytes(), flag, esc))
+        if modo == "bit":
+            return _inserir_zeros(payload)
+        raise ValueError(f"Modo de inserção desconhecido: {modo}")
+
+    def _remover_insercao(self, payload, escape, modo):
+        if modo == "byte":
+            return _para_bits(_desescapar_bytes(payload.tobytes(), _bytes_de(escape, "escape")))
+        if modo == "bit":
+            return _remover_zeros(payload)
+        raise ValueError(f"Modo de inserção desconhecido: {modo}")
+
+    def _codificar_payload(self, payload):
+        # Detecção e correção de erros, e o complemento até o fim do byte
+        if self.instrumentacao is not None:
+            self.instrumentacao.rastrear("Payload original", payload)
+        payload = self._etapa("enquadrar.deteccao", self._adicionar_deteccao, payload)
+        payload = self._etapa("enquadrar.correcao", self._adicionar_correcao, payload)
+        if self.instrumentacao is not None:
+            self.instrumentacao.rastrear("Payload codificado", payload)
+        return payload
+
+    def _adicionar_deteccao(self, payload):
+        for method in self.detection_methods:
+            payload = method(payload)
+        return payload
+
+    def _adicionar_correcao(self, payload):
+        if self.hamming_enabled:
+            payload = self.codificar_hamming(payload)
+        if self.codigo_bloco is not None:
+            payload = self.codigo_bloco.codificar(payload)
+        if self.reed_solomon is not None:
+            payload = self.reed_solomon.codificar(payload)
+        payload = _completar(payload)
+        if self.entrelacador is not None:
+            payload = self.entrelacador.entrelacar(payload)
+        return payload
+
     def adicionar_paridade(self, dados):
         """ Adiciona bit de paridade ao final dos dados """
-        bits = bitarray(dados)
-        paridade = bits.count() % 2
-        return dados + str(paridade)
+        if isinstance(dados, str):
+            return self.adicionar_paridade(bitarray(dados)).to01()
+        return dados + bitarray([dados.count() % 2])
 
-    def adicionar_crc(self, dados):
-        """ Adiciona CRC-32 ao final dos dados """
-        crc = binascii.crc32(bitarray(dados).tobytes()) & 0xFFFFFFFF
-        crc_bits = f"{crc:032b}"
-        return dados + crc_bits
+    def adicionar_crc(self, dados, tipo="CRC-32"):
+        """ Adiciona o CRC (CRC-32 por padrão) ao final dos dados """
+        if isinstance(dados, str):
+            return self.adicionar_crc(bitarray(dados), tipo).to01()
+        crc = CRC(tipo)
+        return dados + bitarray(f"{crc.calcular(dados.tobytes()):0{crc.largura}b}")
 
     def codificar_hamming(self, dados):
         """ Adiciona bits de Hamming para correção de erros """
-        # Converte dados para lista de bits
-        bits = [int(x) for x in dados]
-        n = len(bits)
-        
+        if isinstance(dados, str):
+            return self.codificar_hamming(bitarray(dados)).to01()
+        n = len(dados)
+
         # Calcula quantidade de bits de paridade necessários
         m = 0
         while (1 << m) < (n + m + 1):
             m += 1
-        
-        # Cria vetor com espaço para bits de paridade
-        hamming = [0] * (n + m)
-        
-        # Posiciona bits de dados
-        j = 0
-        for i in range(1, len(hamming) + 1):
-            if (i & (i - 1)) != 0:  # Não é potência de 2
-                hamming[i - 1] = bits[j]
-                j += 1
-        
-        # Calcula bits de paridade
-        for i in range(m):
-            pos = (1 << i) - 1
-            valor = 0
-            for j in range(pos, len(hamming), 1 << (i + 1)):
-                for k in range(j, min(j + (1 << i), len(hamming))):
-                    valor ^= hamming[k]
-            hamming[pos] = valor
-        
-        # Converte para string binária
-        return ''.join(map(str, hamming))
+
+        # Posiciona os bits de dados nas posições (começando em 1) que não são potência de 2
+        posicoes = np.arange(1, n + m + 1)
+        dados_em = (posicoes & (posicoes - 1)) != 0
+        hamming = np.zeros(n + m, dtype=np.uint8)
+        hamming[dados_em] = _bits_para_array(dados)
+
+        # O XOR das posições dos bits 1 é a síndrome; cada bit de paridade (posição 2^i)
+        # recebe o bit i dela, o que zera a síndrome da palavra final
+        sindrome = np.bitwise_xor.reduce(posicoes[hamming == 1], initial=0)
+        hamming[(1 << np.arange(m)) - 1] = (sindrome >> np.arange(m)) & 1
+
+        return _array_para_bits(hamming)
 
     # Recepção
-    def desenquadrar_contagem(self, quadros):
-        dados = ""
+    def desenquadrar_contagem(self, quadros, cabecalho="8", protecao_cabecalho=None):
+        quadros = (bitarray(quadro) for quadro in quadros)
+        return self.desenquadrar_contagem_bits(quadros, cabecalho, protecao_cabecalho).to01()
+
+    def desenquadrar_contagem_bytes(self, quadros, cabecalho="8", protecao_cabecalho=None):
+        """ Desenquadra quadros em bytes (ou memoryview) gerados por enquadrar_contagem_bytes """
+        quadros = (_para_bits(quadro) for quadro in quadros)
+        return self.desenquadrar_contagem_bits(quadros, cabecalho, protecao_cabecalho).tobytes()
+
+    def desenquadrar_contagem_bits(self, quadros, cabecalho="8", protecao_cabecalho=None):
+        dados = bitarray()
         for quadro in quadros:
-            # Converte os 8 primeiros bits para tamanho do payload em bytes
-            tamanho_bytes = int(quadro[:8], 2)
-            
-            # Calcula o tamanho em bits (8 bits por byte)
-            tamanho_bits = tamanho_bytes * 8
-            
+            # O cabeçalho (no máximo o varint mais longo e um CRC-32) tem o tamanho do payload em bytes
+            lido = self._etapa("desenquadrar.cabecalho", self._ler_cabecalho_quadro,
+                               quadro, cabecalho, protecao_cabecalho)
+            tamanho_bytes, inicio = lido
+
             # Extrai o payload completo
-            payload = quadro[8:8 + tamanho_bits]
-            
-            # Aplica decodificação Hamming se habilitado
-            if self.hamming_enabled:
-                payload = self.decodificar_hamming(payload)
-                print("Após decodificar Hamming:", payload)
-            
-            # Verifica métodos de detecção
-            for method in self.detection_methods:
-                if method == self.adicionar_crc:
-                    # Remove o CRC-32 (últimos 32 bits) após a verificação
-                    if not self.verificar_crc(payload):
-                        raise ValueError("Erro detectado no quadro (CRC-32 inválido)")
-                    payload = payload[:-32]
-                elif method == self.adicionar_paridade:
-                    # Remove o bit de paridade (último bit) após a verificação
-                    if not self.verificar_paridade(payload):
-                        raise ValueError("Erro detectado no quadro (Paridade inválida)")
-                    payload = payload[:-1]
-            
-            dados += payload
-        
+            payload = quadro[8 * inicio:8 * (inicio + tamanho_bytes)]
+
+            dados += self._decodificar_payload(payload)
+
         return dados
 
-    def desenquadrar_insercao(self, quadros, delimitador="01111110", escape="00100011"):
+    def _ler_cabecalho_quadro(self, quadro, cabecalho, protecao_cabecalho):
+        try:
+            lido = _ler_cabecalho(quadro[:8 * (_MAX_BYTES_VARINT + 4)].tobytes(), 0, cabecalho, protecao_cabecalho)
+        except ValueError:
+            self._contar("falhas_cabecalho")
+            raise
+        if lido is None:
+            self._contar("falhas_cabecalho")
+            raise ValueError("Quadro menor que o cabeçalho")
+        return lido
+
+    def desenquadrar_insercao(self, quadros, delimitador="01111110", escape="00100011", modo="byte"):
         """ Desenquadra os dados utilizando inserção de flags """
-        dados = ""
+        quadros = (bitarray(quadro) for quadro in quadros)
+        return self.desenquadrar_insercao_bits(quadros, delimitador, escape, modo).to01()
+
+    def desenquadrar_insercao_bytes(self, quadros, delimitador="01111110", escape="00100011", modo="byte"):
+        """ Desenquadra quadros em bytes (ou memoryview) gerados por enquadrar_insercao_bytes """
+        quadros = (_para_bits(quadro) for quadro in quadros)
+        return self.desenquadrar_insercao_bits(quadros, delimitador, escape, modo).tobytes()
+
+    def desenquadrar_insercao_bits(self, quadros, delimitador="01111110", escape="00100011", modo="byte"):
+        flag = _para_bits(delimitador)
+        dados = bitarray()
         for quadro in quadros:
-            payload = quadro[len(delimitador):-len(delimitador)]
-            desescaped_payload = ""
-            i = 0
-            while i < len(payload):
-                byte = payload[i:i + 8]
-                if byte == escape:
-                    i += 8
-                    byte = payload[i:i + 8]
-                desescaped_payload += byte
-                i += 8
-            if self.hamming_enabled:
-                desescaped_payload = self.decodificar_hamming(desescaped_payload)
-            for method in self.detection_methods:
-                if not method(desescaped_payload):
-                    raise ValueError("Erro detectado no quadro")
-            
-            if self.adicionar_crc in self.detection_methods:
-                # Remove o CRC-32 (últimos 32 bits) após a verificação
-                desescaped_payload = desescaped_payload[:-32]
-            
-            dados += desescaped_payload
+            # O delimitador final é a última ocorrência (no modo bit, em bytes, ele pode vir seguido
+            # dos zeros que completam o último byte)
+            fim = quadro.find(flag, len(flag), right=True)
+            if quadro[:len(flag)] != flag or fim < 0:
+                raise ValueError("Quadro sem delimitadores")
+            payload = self._etapa("desenquadrar.insercao", self._remover_insercao, quadro[len(flag):fim], escape, modo)
+            dados += self._decodificar_payload(payload)
         return dados
 
+    def _decodificar_payload(self, payload):
+        # Desfaz _codificar_payload: desfaz o entrelaçamento, remove o complemento, corrige com
+        # Reed-Solomon e Hamming e verifica a detecção (na ordem inversa em que foi aplicada),
+        # removendo os bits de verificação
+        try:
+            payload = self._etapa("desenquadrar.correcao", self._corrigir, payload)
+            payload = self._etapa("desenquadrar.deteccao", self._verificar_deteccao, payload)
+        except ValueError:
+            self._contar("quadros_descartados")
+            raise
+        if self.instrumentacao is not None:
+            self.instrumentacao.contar("quadros_recebidos")
+            self.instrumentacao.contar("bytes_recebidos", (len(payload) + 7) // 8)
+            self.instrumentacao.rastrear("Payload recebido", payload)
+        return payload
+
+    def _corrigir(self, payload):
+        if self.entrelacador is not None:
+            payload = self.entrelacador.desentrelacar(payload)
+        payload = _remover_complemento(payload)
+
+        if self.reed_solomon is not None:
+            try:
+                payload, corrigidos = self.reed_solomon.corrigir(payload)
+            except ValueError:
+                self._contar("falhas_reed_solomon")
+                raise
+            # Número de bytes corrigidos
+            self._contar("correcoes_reed_solomon", corrigidos)
+
+        if self.codigo_bloco is not None:
+            try:
+                payload, corrigidos = self.codigo_bloco.corrigir(payload)
+            except ValueError:
+                self._contar("erros_duplos")
+                raise
+            self._contar("correcoes_hamming", corrigidos)
+
+        # Aplica decodificação Hamming se habilitado
+        if self.hamming_enabled:
+            payload, corrigido = self._decodificar_hamming(payload)
+            self._contar("correcoes_hamming", corrigido)
+        return payload
+
+    def _verificar_deteccao(self, payload):
+        for nome in reversed(self.detection_names):
+            if nome in CRC.TIPOS:
+                if not self.verificar_crc(payload, nome):
+                    self._contar("falhas_crc")
+                    raise ValueError(f"Erro detectado no quadro ({nome} inválido)")
+                payload = payload[:-CRC.TIPOS[nome][0]]
+            elif nome == "Paridade":
+                if not self.verificar_paridade(payload):
+                    self._contar("falhas_paridade")
+                    raise ValueError("Erro detectado no quadro (Paridade inválida)")
+                payload = payload[:-1]
+        return payload
+
     def verificar_paridade(self, dados):
         """ Verifica se o bit de paridade é válido """
-        bits = bitarray(dados[:-1])
-        paridade = int(dados[-1])
-        return bits.count() % 2 == paridade
-
-    def verificar_crc(self, dados):
-        """ Verifica se o CRC-32 é válido """
-        crc_calculado = binascii.crc32(bitarray(dados[:-32]).tobytes()) & 0xFFFFFFFF
-        crc_recebido = int(dados[-32:], 2)
+        dados = _para_bits(dados)
+        return dados.count() % 2 == 0
+
+    def verificar_crc(self, dados, tipo="CRC-32"):
+        """ Verifica se o CRC (CRC-32 por padrão) no fim dos dados é válido """
+        dados = _para_bits(dados)
+        crc = CRC(tipo)
+        crc_calculado = crc.calcular(dados[:-crc.largura].tobytes())
+        crc_recebido = int(dados[-crc.largura:].to01(), 2)
         return crc_calculado == crc_recebido
 
     def decodificar_hamming(self, dados):
         """ Decodifica bits de Hamming e corrige um erro """
-        # Converte dados para lista de bits
-        bits = [int(x) for x in dados]
-        
-        # Calcula quantidade de bits de paridade
-        m = 0
-        while (1 << m) < len(bits) + 1:
-            m += 1
-        
-        # Verifica posição do erro
-        erro = 0
-        for i in range(m):
-            pos = (1 << i) - 1
-            valor = 0
-            for j in range(pos, len(bits), 1 << (i + 1)):
-                for k in range(j, min(j + (1 << i), len(bits))):
-                    valor ^= bits[k]
-            if valor != 0:
-                erro += (1 << i)
-        
+        if isinstance(dados, str):
+            return self.decodificar_hamming(bitarray(dados)).to01()
+        return self._decodificar_hamming(dados)[0]
+
+    def _decodificar_hamming(self, dados):
+        # Devolve (dados, 1 se um erro foi corrigido ou 0)
+        bits = _bits_para_array(dados).copy()
+        posicoes = np.arange(1, len(bits) + 1)
+
+        # A síndrome (XOR das posições dos bits 1) é a posição do erro
+        erro = np.bitwise_xor.reduce(posicoes[bits == 1], initial=0)
+
         # Corrige erro apenas se estiver dentro do intervalo
-        if 0 < erro <= len(bits):
+        corrigido = 0 < erro <= len(bits)
+        if corrigido:
             bits[erro - 1] ^= 1
-        
-        # Recupera bits de dados originais
-        dados_recuperados = []
-        for i in range(1, len(bits) + 1):
-            if (i & (i - 1)) != 0:  # Não é potência de 2
-                dados_recuperados.append(bits[i - 1])
-        
-        return ''.join(map(str, dados_recuperados))
+
+        # Recupera bits de dados originais (posições que não são potência de 2)
+        return _array_para_bits(bits[(posicoes & (posicoes - 1)) != 0]), int(corrigido)
+
+class DesenquadradorStream:
+    """ Desenquadrador incremental para fluxos (ex.: recv de um socket TCP).
+
+    Recebe pedaços de tamanho arbitrário com feed() e devolve os payloads (bytes) de cada quadro
+    completo, já verificado, assim que o último byte dele chega. Só a parte ainda incompleta fica
+    guardada. Os quadros são os gerados por enquadrar_contagem_bytes ou enquadrar_insercao_bytes,
+    um atrás do outro no fluxo.
+
+    Na contagem, um cabeçalho com tamanho acima de tamanho_maximo_quadro (bytes de payload codificado)
+    é tratado como corrompido, o que limita a memória guardada. Depois de um cabeçalho corrompido
+    (com protecao_cabecalho), o fluxo é ressincronizado byte a byte e cada cabeçalho encontrado é
+    provisório: só é aceito se o payload dele passar pela correção e detecção da camada. Sem detecção
+    na camada, um cabeçalho falso pode ser aceito
+    """
+    # Maior payload (em bytes, já codificado) aceito na contagem
+    TAMANHO_MAXIMO_QUADRO = 1 << 16
+
+    def __init__(self, camada, enquadramento="contagem", delimitador="01111110", escape="00100011",
+                 modo="byte", cabecalho="8", protecao_cabecalho=None, tamanho_maximo_quadro=None):
+        if enquadramento not in ("contagem", "insercao"):
+            raise ValueError(f"Enquadramento desconhecido: {enquadramento}")
+        if enquadramento == "insercao" and modo not in ("byte", "bit"):
+            raise ValueError(f"Modo de inserção desconhecido: {modo}")
+        self.camada = camada
+        self.enquadramento = enquadramento
+        self.escape = escape
+        self.modo = modo
+        self.cabecalho = cabecalho
+        self.protecao_cabecalho = protecao_cabecalho
+        self.tamanho_maximo_quadro = tamanho_maximo_quadro or self.TAMANHO_MAXIMO_QUADRO
+        # No modo bit o fluxo é tratado como bits (os quadros não começam em bytes inteiros)
+        self._em_bits = enquadramento == "insercao" and modo == "bit"
+        if self._em_bits:
+            self._flag = _para_bits(delimitador)
+            self._buffer = bitarray()
+        else:
+            self._flag = _bytes_de(delimitador, "delimitador") if enquadramento == "insercao" else None
+            self._esc = _bytes_de(escape, "escape")[0] if enquadramento == "insercao" else None
+            self._buffer = bytearray()
+        self._posicao = 0     # Início do quadro (ou do conteúdo do quadro) ainda não processado
+        self._busca = 0       # Onde continuar a procura pelo próximo delimitador
+        self._dentro = False  # Se um delimitador de abertura já foi visto
+        self._sincronizando = False  # Se está procurando um cabeçalho válido depois de um corrompido
+        self._candidatos = []        # Cabeçalhos válidos encontrados na ressincronização, à espera do payload
+
+    def feed(self, data):
+        """ Acrescenta um pedaço do fluxo e devolve um iterador com os payloads dos quadros completos.
+
+        Os bytes ficam guardados mesmo que o iterador não seja percorrido. Um quadro com erro gera
+        ValueError, mas já foi descartado: o próximo feed() continua do quadro seguinte
+        """
+        # Descarta o que já foi consumido antes de acrescentar o pedaço novo
+        del self._buffer[:self._posicao]
+        self._busca -= self._posicao
+        self._candidatos = [posicao - self._posicao for posicao in self._candidatos]
+        self._posicao = 0
+        if self._em_bits:
+            self._buffer.frombytes(data)
+        else:
+            self._buffer += data
+        if self.enquadramento == "contagem":
+            return self._payloads_contagem()
+        return self._payloads_insercao()
+
+    def pendentes(self):
+        """ Tamanho do trecho ainda guardado (bytes, ou bits no modo bit) """
+        return len(self._buffer) - self._posicao
+
+    def _payloads_contagem(self):
+        buffer = self._buffer
+        while len(buffer) > self._posicao:
+            if self._sincronizando:
+                if not self._ressincronizar():
+                    return
+                self._sincronizando = False
+            try:
+                lido = self._ler_cabecalho(self._posicao)
+            except ValueError:
+                # Sem um tamanho confiável, o fluxo é ressincronizado a partir do byte seguinte;
+                # só o cabeçalho inválido que começou a ressincronização gera erro
+                self._posicao += 1
+                self._sincronizando = True
+                self._busca = self._posicao
+                self._candidatos = []
+                self.camada._contar("falhas_cabecalho")
+                raise
+            if lido is None:
+                return
+            tamanho_bytes, inicio = lido
+            fim = inicio + tamanho_bytes
+            if len(buffer) < fim:
+                return
+            self._posicao = fim
+            yield self.camada._decodificar_payload(_para_bits(buffer[inicio:fim])).tobytes()
+
+    def _ler_cabecalho(self, posicao):
+        lido = _ler_cabecalho(self._buffer, posicao, self.cabecalho, self.protecao_cabecalho)
+        if lido is not None and lido[0] > self.tamanho_maximo_quadro:
+            raise ValueError(f"Quadro de {lido[0]} bytes maior que o máximo ({self.tamanho_maximo_quadro} bytes)")
+        return lido
+
+    def _ressincronizar(self):
+        # Procura o próximo quadro depois de um cabeçalho corrompido. Um CRC de cabeçalho pode passar por
+        # acaso dentro de um quadro, então cada posição com cabeçalho válido é só um candidato, aceito quando
+        # o payload inteiro chega e decodifica. Candidatos ainda incompletos não impedem a procura nos bytes
+        # seguintes e ficam guardados para o próximo feed(). Devolve True ao aceitar um candidato
+        pendentes = []
+        for posicao in itertools.chain(self._candidatos, range(self._busca, len(self._buffer))):
+            resultado = self._testar_candidato(posicao)
+            if resultado:
+                self._posicao = posicao
+                self._candidatos = []
+                return True
+            if resultado is None:
+                pendentes.append(posicao)
+        # O buffer é guardado a partir do candidato pendente mais antigo
+        self._candidatos = pendentes
+        self._busca = len(self._buffer)
+        self._posicao = pendentes[0] if pendentes else self._busca
+        return False
+
+    def _testar_candidato(self, posicao):
+        # True/False se o quadro que começaria em posicao decodifica ou não; None se ainda faltam bytes
+        try:
+            lido = self._ler_cabecalho(posicao)
+        except ValueError:
+            return False
+        if lido is None:
+            return None
+        tamanho_bytes, inicio = lido
+        if len(self._buffer) < inicio + tamanho_bytes:
+            return None
+        # Decodifica sem instrumentação, para os candidatos falsos não entrarem nos contadores
+        payload = _para_bits(self._buffer[inicio:inicio + tamanho_bytes])
+        instrumentacao, self.camada.instrumentacao = self.camada.instrumentacao, None
+        try:
+            self.camada._decodificar_payload(payload)
+            return True
+        except ValueError:
+            return False
+        finally:
+            self.camada.instrumentacao = instrumentacao
+
+    def _payloads_insercao(self):
+        buffer, flag = self._buffer, self._flag
+        while True:
+            i = buffer.find(flag, self._busca)
+            if i < 0:
+                # O delimitador pode estar chegando pela metade: a procura recomeça antes do fim
+                self._busca = max(len(buffer) - len(flag) + 1, self._busca)
+                if not self._dentro:
+                    self._posicao = self._busca  # Nada fora de um quadro precisa ser guardado
+                return
+            self._busca = i + len(flag)
+            if not self._dentro:
+                self._dentro = True
+                self._posicao = i + len(flag)
+                continue
+            if not self._em_bits and self._escapado(i):
+                continue
+
+            conteudo = buffer[self._posicao:i]
+            self._posicao = i + len(flag)
+            if len(conteudo):
+                self._dentro = False
+                payload = self.camada._remover_insercao(_para_bits(conteudo), self.escape, self.modo)
+                yield self.camada._decodificar_payload(payload).tobytes()
+            # Delimitadores seguidos (quadro vazio): o último deles abre o próximo quadro
+
+    def _escapado(self, i):
+        # O delimitador é um dado se for precedido por um número ímpar de escapes
+        # (um par de escapes é um escape literal)
+        j = i
+        while j > self._posicao and self._buffer[j - 1] == self._esc:
+            j -= 1
+        return (i - j) % 2 == 1
+
+
+# Camadas já criadas em cada processo, para reaproveitar códigos de Hamming e tabelas de CRC entre lotes
+_camadas = {}
+
+
+def _camada(detection_correction):
+    camada = _camadas.get(detection_correction)
+    if camada is None:
+        camada = _camadas[detection_correction] = CamadaEnlace(detection_correction)
+    return camada
+
+
+def _executar_lote(detection_correction, medir, operacao):
+    # Executa operacao(camada) e devolve (resultado, snapshot, erro). Com medir=True cada lote tem a sua
+    # Instrumentacao, e o snapshot volta ao processo principal mesmo quando o lote falha com ValueError
+    camada = _camada(detection_correction)
+    camada.instrumentacao = Instrumentacao() if medir else None
+    try:
+        resultado, erro = operacao(camada), None
+    except ValueError as excecao:
+        resultado, erro = None, excecao
+    snapshot = camada.instrumentacao.snapshot() if medir else None
+    return resultado, snapshot, erro
+
+
+def _enquadrar_lote(detection_correction, medir, enquadramento, tamanho_maximo, opcoes, dados):
+    """ Enquadra um lote de dados (bytes) em um processo do pool """
+    if enquadramento == "contagem":
+        return _executar_lote(detection_correction, medir,
+                              lambda camada: camada.enquadrar_contagem_bytes(dados, tamanho_maximo, **opcoes))
+    return _executar_lote(detection_correction, medir,
+                          lambda camada: camada.enquadrar_insercao_bytes(dados, tamanho_maximo, **opcoes))
+
+
+def _desenquadrar_lote(detection_correction, medir, enquadramento, opcoes, quadros):
+    """ Verifica e decodifica um lote de quadros (bytes) em um processo do pool """
+    if enquadramento == "contagem":
+        return _executar_lote(detection_correction, medir,
+                              lambda camada: camada.desenquadrar_contagem_bytes(quadros, **opcoes))
+    return _executar_lote(detection_correction, medir,
+                          lambda camada: camada.desenquadrar_insercao_bytes(quadros, **opcoes))
+
+
+class EnquadradorParalelo:
+    """ Enquadramento e desenquadramento em paralelo num ProcessPoolExecutor.
+
+    Os quadros são independentes, então os dados são divididos em lotes de quadros_por_lote
+    quadros inteiros, cada lote vai para um processo e os resultados voltam na ordem original
+    (executor.map). Os quadros gerados são idênticos aos de CamadaEnlace.enquadrar_*_bytes.
+    O pool é criado na primeira chamada e fica aberto até fechar() (ou o fim do bloco with).
+    Com uma Instrumentacao, os contadores e tempos de cada lote são somados a ela na ordem dos lotes
+    (até o lote que falhou, como no serial); o rastreio não é repassado aos processos
+    """
+    def __init__(self, detection_correction, processos=None, quadros_por_lote=256, instrumentacao=None):
+        self.instrumentacao = instrumentacao
+        self.detection_correction = tuple(detection_correction)
+        self.processos = processos or os.cpu_count() or 1
+        self.quadros_por_lote = quadros_por_lote
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def fechar(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _mapear(self, funcao, lotes, *argumentos):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processos)
+        # O lote é o último argumento das funções dos processos; map devolve os resultados em ordem
+        medir = self.instrumentacao is not None
+        for resultado, snapshot, erro in self._executor.map(
+                partial(funcao, self.detection_correction, medir, *argumentos), lotes):
+            if snapshot is not None:
+                self.instrumentacao.mesclar(snapshot)
+            if erro is not None:
+                raise erro
+            yield resultado
+
+    def _enquadrar(self, enquadramento, dados, tamanho_maximo, opcoes):
+        # Lotes com um número inteiro de quadros, para a divisão ser a mesma do enquadramento serial
+        dados = bytes(dados)
+        tamanho_lote = tamanho_maximo * self.quadros_por_lote
+        lotes = [dados[inicio:inicio + tamanho_lote] for inicio in range(0, len(dados), tamanho_lote)]
+        resultados = self._mapear(_enquadrar_lote, lotes, enquadramento, tamanho_maximo, opcoes)
+        return [quadro for quadros in resultados for quadro in quadros]
+
+    def _desenquadrar(self, enquadramento, quadros, opcoes):
+        quadros = [bytes(quadro) for quadro in quadros]
+        lotes = [quadros[inicio:inicio + self.quadros_por_lote]
+                 for inicio in range(0, len(quadros), self.quadros_por_lote)]
+        return b"".join(self._mapear(_desenquadrar_lote, lotes, enquadramento, opcoes))
+
+    def enquadrar_contagem(self, dados, tamanho_maximo, cabecalho="8", protecao_cabecalho=None):
+        """ Como CamadaEnlace.enquadrar_contagem_bytes (tamanho_maximo em bytes, quadros em bytes) """
+        opcoes = {"cabecalho": cabecalho, "protecao_cabecalho": protecao_cabecalho}
+        return self._enquadrar("contagem", dados, tamanho_maximo, opcoes)
+
+    def enquadrar_insercao(self, dados, tamanho_maximo, delimitador="01111110", escape="00100011", modo="byte"):
+        """ Como CamadaEnlace.enquadrar_insercao_bytes (tamanho_maximo em bytes, quadros em bytes) """
+        opcoes = {"delimitador": delimitador, "escape": escape, "modo": modo}
+        return self._enquadrar("insercao", dados, tamanho_maximo, opcoes)
+
+    def desenquadrar_contagem(self, quadros, cabecalho="8", protecao_cabecalho=None):
+        """ Como CamadaEnlace.desenquadrar_contagem_bytes; um quadro com erro gera ValueError """
+        opcoes = {"cabecalho": cabecalho, "protecao_cabecalho": protecao_cabecalho}
+        return self._desenquadrar("contagem", quadros, opcoes)
+
+    def desenquadrar_insercao(self, quadros, delimitador="01111110", escape="00100011", modo="byte"):
+        """ Como CamadaEnlace.desenquadrar_insercao_bytes; um quadro com erro gera ValueError """
+        opcoes = {"delimitador": delimitador, "escape": escape, "modo": modo}
+        return self._desenquadrar("insercao", quadros, opcoes)
+
 
 # Exemplo de uso
 if __name__ == "__main__":
-    camada_enlace = CamadaEnlace(["CRC-32"])     #"CRC-32", "Paridade"])
+    # rastreio=True mostra o payload e o quadro em cada etapa
+    instrumentacao = Instrumentacao(rastreio=True)
+    camada_enlace = CamadaEnlace(["CRC-32"], instrumentacao)     #"CRC-32", "Paridade"])
 
     dados = "1010101011110000"
     #"1010101011110000"
@@ -221,3 +1364,4 @@ if __name__ == "__main__":
     # Recepção e desenquadramento
     dados_recebidos = camada_enlace.desenquadrar_contagem(quadros)
     print("Dados recebidos:", dados_recebidos)
+    print("Contadores:", dict(instrumentacao.contadores))
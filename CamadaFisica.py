@@ -1,275 +1,932 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+
+def _bits_para_simbolos(bits, bits_por_simbolo):
+    # Agrupa os bits (completando com zeros) e converte cada grupo em um índice de símbolo, MSB primeiro
+    bits = np.asarray(bits, dtype=np.int8)
+    padding_needed = (-len(bits)) % bits_por_simbolo
+    bits_padded = np.concatenate([bits, np.zeros(padding_needed, dtype=np.int8)])
+    pesos = 1 << np.arange(bits_por_simbolo - 1, -1, -1)
+    return bits_padded.reshape(-1, bits_por_simbolo) @ pesos
+
+
+def _simbolos_para_bits(simbolos, bits_por_simbolo):
+    # Operação inversa: cada índice de símbolo volta a ser um grupo de bits, MSB primeiro
+    deslocamentos = np.arange(bits_por_simbolo - 1, -1, -1)
+    bits = (np.asarray(simbolos)[:, np.newaxis] >> deslocamentos) & 1
+    return bits.astype(np.int8).reshape(-1)
+
+
+def _bits_por_simbolo(num_simbolos):
+    # Número de bits carregados por símbolo de um alfabeto com num_simbolos (potência de 2)
+    k = int(num_simbolos).bit_length() - 1
+    if num_simbolos < 2 or (1 << k) != num_simbolos:
+        raise ValueError(f"O número de símbolos deve ser uma potência de 2 (recebido {num_simbolos})")
+    return k
+
+
+def _alinhar_blocos(blocos, multiplo, incluir_resto):
+    # Junta blocos de tamanho arbitrário e devolve pedaços com tamanho múltiplo de `multiplo`.
+    # Só o resto (menos de `multiplo` elementos) fica guardado entre um bloco e o próximo
+    resto = np.zeros(0)
+    for bloco in blocos:
+        bloco = np.asarray(bloco)
+        if len(resto):
+            bloco = np.concatenate([resto, bloco])
+        utilizavel = len(bloco) - len(bloco) % multiplo
+        if utilizavel:
+            yield bloco[:utilizavel]
+        resto = bloco[utilizavel:]
+    if incluir_resto and len(resto):
+        yield resto
+
+
+def _reagrupar_blocos(arrays, tamanho_bloco):
+    # Reparte uma sequência de arrays em blocos de tamanho fixo (o último pode ser menor)
+    for array in _alinhar_blocos(arrays, tamanho_bloco, incluir_resto=True):
+        for inicio in range(0, len(array), tamanho_bloco):
+            yield array[inicio:inicio + tamanho_bloco]
+
+
+class SinalLazy:
+    # Sinal guardado na taxa de símbolos: os índices dos símbolos e a tabela com a forma de onda de cada um.
+    # As amostras só são geradas para a janela pedida e o eixo do tempo é calculado, nunca guardado
+    def __init__(self, simbolos, tabela):
+        self.simbolos = np.asarray(simbolos, dtype=np.intp)
+        self.tabela = np.asarray(tabela)
+        self.amostras_por_simbolo = self.tabela.shape[1]
+
+    def __len__(self):
+        return len(self.simbolos) * self.amostras_por_simbolo
+
+    @property
+    def dtype(self):
+        return self.tabela.dtype
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fim, passo = indice.indices(len(self))
+            if passo == 1:
+                return self._janela(inicio, max(inicio, fim))
+            indices = np.arange(inicio, fim, passo)
+        elif isinstance(indice, (int, np.integer)):
+            indices = indice + len(self) if indice < 0 else indice
+            if not 0 <= indices < len(self):
+                raise IndexError("Índice fora do sinal")
+        else:
+            indices = self._normalizar_indices(indice)
+        # Índices arbitrários: símbolo e posição dentro do símbolo de cada amostra
+        simbolo, posicao = np.divmod(indices, self.amostras_por_simbolo)
+        return self.tabela[self.simbolos[simbolo], posicao]
+
+    def _normalizar_indices(self, indice):
+        # Máscara booleana ou vetor de índices inteiros, sem montar um índice do tamanho do sinal
+        indices = np.asarray(indice)
+        if indices.dtype == np.bool_:
+            if indices.shape != (len(self),):
+                raise IndexError("A máscara deve ter o mesmo tamanho do sinal")
+            return np.flatnonzero(indices)
+        if not np.issubdtype(indices.dtype, np.integer):
+            raise IndexError("Índices devem ser inteiros, fatias ou máscaras booleanas")
+        indices = np.where(indices < 0, indices + len(self), indices)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError("Índice fora do sinal")
+        return indices
+
+    def _janela(self, inicio, fim):
+        # Gera apenas os símbolos que cobrem [inicio, fim) e recorta as bordas
+        if inicio == fim:
+            return np.zeros(0, dtype=self.dtype)
+        primeiro = inicio // self.amostras_por_simbolo
+        ultimo = (fim - 1) // self.amostras_por_simbolo + 1
+        amostras = self.tabela[self.simbolos[primeiro:ultimo]].reshape(-1)
+        deslocamento = primeiro * self.amostras_por_simbolo
+        return amostras[inicio - deslocamento:fim - deslocamento]
+
+    def __iter__(self):
+        return self.blocos()
+
+    def blocos(self, tamanho_bloco=4096):
+        # Itera sobre o sinal em blocos de amostras de tamanho fixo (o último pode ser menor)
+        for inicio in range(0, len(self), tamanho_bloco):
+            yield self._janela(inicio, min(inicio + tamanho_bloco, len(self)))
+
+    def to_array(self):
+        return self._janela(0, len(self))
+
+    def __array__(self, dtype=None, copy=None):
+        # Permite np.asarray(sinal); as amostras são sempre geradas num array novo
+        sinal = self.to_array()
+        return sinal if dtype is None else sinal.astype(dtype, copy=False)
+
+    def tempo(self, inicio=0, fim=None):
+        # Mesmo eixo que np.linspace(0, símbolos, len(sinal)), calculado só para [inicio, fim)
+        fim = len(self) if fim is None else fim
+        passo = len(self.simbolos) / (len(self) - 1) if len(self) > 1 else 0.0
+        return np.arange(inicio, fim) * passo
+
+
 class ModulacaoDigital:
-    def __init__(self, taxa_amostragem=1000, amplitude=1):
+    # Esquemas aceitos por modular/demodular e pelas versões em fluxo
+    ESQUEMAS = ("NRZ-Polar", "Manchester", "Bipolar")
+
+    def __init__(self, taxa_amostragem=1000, amplitude=1, dtype=None):
         self.taxa_amostragem = taxa_amostragem
         self.amplitude = amplitude
+        # Tipo das amostras geradas (ex.: np.int8 usa 1 byte por amostra); None mantém o tipo padrão do NumPy
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        if self.dtype is not None and self.dtype.kind in "iu":
+            limite = np.iinfo(self.dtype)
+            if not (limite.min <= -amplitude and amplitude <= limite.max) or amplitude != int(amplitude):
+                raise ValueError(f"Amplitude {amplitude} não cabe no tipo {self.dtype}")
+
+    def _no_tipo(self, amostras):
+        # Converte para o dtype escolhido; sem dtype, mantém o tipo que o NumPy deu (int64 com amplitude inteira)
+        return amostras if self.dtype is None else amostras.astype(self.dtype, copy=False)
+
+    def _preparar_bits(self, bits):
+        # Converte a entrada (lista, array 1-D ou 2-D com vários quadros) em array de bits
+        return np.asarray(bits, dtype=np.int8)
+
+    def _tempo(self, bits):
+        # Vetor de tempo de um quadro (a última dimensão guarda os bits)
+        num_bits = bits.shape[-1] if bits.ndim else 0
+        return np.linspace(0, num_bits, num_bits * self.taxa_amostragem)
 
     def nrz_polar(self, bits):
-        # Calcula o vetor de tempo
-        tempo = np.linspace(0, len(bits), len(bits) * self.taxa_amostragem)
-        # Inicializa o vetor de sinais
-        sinal = np.repeat(bits, self.taxa_amostragem)
-        sinal_modulado = np.where(sinal == 1, self.amplitude, -self.amplitude)
+        bits = self._preparar_bits(bits)
+        tempo = self._tempo(bits)
+
+        # Bit 1 -> +V, bit 0 -> -V, repetido por todas as amostras do bit
+        niveis = self._no_tipo(np.where(bits == 1, self.amplitude, -self.amplitude))
+        sinal_modulado = np.repeat(niveis, self.taxa_amostragem, axis=-1)
         return tempo, sinal_modulado
 
     def manchester(self, bits):
-        # Calcula o vetor de tempo
-        tempo = np.linspace(0, len(bits), len(bits) * self.taxa_amostragem)
-        
-        # Inicializa o vetor de sinais
-        sinal = []
-        
-        for bit in bits:
-            # Cada bit é representado por uma transição no meio do intervalo de tempo
-            if bit:
-                # Transição de +V para -V (bit 1), metade do sinal está em +V e a outra metade no -V
-                sinal.extend([self.amplitude] * (self.taxa_amostragem // 2) + [-self.amplitude] * (self.taxa_amostragem // 2))
-            else:
-                # Transição de -V para +V (bit 0), etade do sinal está em -V e a outra metade no +V
-                sinal.extend([-self.amplitude] * (self.taxa_amostragem // 2) + [self.amplitude] * (self.taxa_amostragem // 2))
-        
-        sinal_modulado = np.array(sinal)
-
+        bits = self._preparar_bits(bits)
+        tempo = self._tempo(bits)
+
+        # Forma de onda do bit 1: metade em +V e a outra metade em -V
+        # (o bit 0 é a mesma forma invertida, de -V para +V)
+        meio = self.taxa_amostragem // 2
+        pulso = np.full(self.taxa_amostragem, -self.amplitude, dtype=self.dtype)
+        pulso[:meio] = self.amplitude
+
+        # (..., bits, 1) * (amostras,) -> (..., bits, amostras)
+        sinais = np.where(bits == 1, 1, -1).astype(pulso.dtype)[..., np.newaxis] * pulso
+        sinal_modulado = sinais.reshape(*bits.shape[:-1], -1)
         return tempo, sinal_modulado
-        
-    def bipolar(self, bits):
-        # Calcula o vetor de tempo
-        tempo = np.linspace(0, len(bits), len(bits) * self.taxa_amostragem)
 
-        # Inicializa o vetor de sinais
-        sinal = []
-        last_sign = 1  # Começamos com +V para o primeiro bit 1
+    def bipolar(self, bits, uns_anteriores=0):
+        bits = self._preparar_bits(bits)
+        tempo = self._tempo(bits)
+
+        # AMI: os bits 1 alternam entre +V e -V (começando em +V), o bit 0 é 0.
+        # A polaridade de cada 1 vem da paridade da soma acumulada dos 1s do quadro
+        # (uns_anteriores continua a alternância de um trecho anterior do mesmo fluxo)
+        contagem = np.cumsum(bits, axis=-1) + uns_anteriores
+        polaridade = np.where(contagem % 2 == 1, 1, -1)
+        niveis = self._no_tipo(bits * polaridade * self.amplitude)
 
-        for bit in bits:
-            if bit:
-                # Alterna entre +V e -V para os bits 1
-                sinal.append(self.amplitude * last_sign)
-                last_sign *= -1  # Alterna a polaridade para o próximo bit 1
-            else:
-                # Bit 0 é representado por 0
-                sinal.append(0)
-        
         # Agora, para representar o sinal na forma amostrada
-        sinal_modulado = np.repeat(sinal, self.taxa_amostragem)
-        
+        sinal_modulado = np.repeat(niveis, self.taxa_amostragem, axis=-1)
         return tempo, sinal_modulado
     
-    def nrz_polar_decode(self, sinal):
-        # Decodifica o sinal do padrão NRZ Polar
-        bits = [-1 if componente < 0 else 0 for componente in sinal]
+    def _matriz_simbolos(self, sinal):
+        # Organiza o sinal como uma matriz (..., bits, amostras_por_bit), descartando um bit incompleto no final.
+        # Um sinal 2-D (quadros, amostras) vira (quadros, bits, amostras_por_bit)
+        sinal = np.asarray(sinal)
+        amostras_por_bit = self.taxa_amostragem
+        num_bits = sinal.shape[-1] // amostras_por_bit
+        return sinal[..., :num_bits * amostras_por_bit].reshape(*sinal.shape[:-1], num_bits, amostras_por_bit)
+
+    def _integrar(self, matriz):
+        # Integra (soma) as amostras de cada bit; inteiros são acumulados em int64 para não estourar
+        acumulador = np.int64 if matriz.dtype.kind in "iub" else None
+        return matriz.sum(axis=-1, dtype=acumulador)
 
-        return bits
+    def nrz_polar_decode(self, sinal):
+        # Integrate-and-dump: o sinal da integral de cada bit decide entre +V (bit 1) e -V (bit 0)
+        matriz = self._matriz_simbolos(sinal)
+        return (self._integrar(matriz) > 0).astype(np.int8)
 
     def manchester_decode(self, sinal):
-        # Inicializa o vetor de bits
-        bits = []
+        # Diferença entre as médias das duas metades do bit: +V -> -V é bit 1, -V -> +V é bit 0
+        matriz = self._matriz_simbolos(sinal)
+        meio = self.taxa_amostragem // 2
+        primeira = self._integrar(matriz[..., :meio]) / meio
+        segunda = self._integrar(matriz[..., meio:]) / (self.taxa_amostragem - meio)
+        return (primeira > segunda).astype(np.int8)
+
+    def bipolar_decode(self, sinal, limiar=None):
+        # Tanto negativo quanto positivo equivalem ao bit 1: o bit é 1 quando o módulo do nível médio
+        # passa do limiar (por padrão, metade da amplitude)
+        limiar = self.amplitude / 2 if limiar is None else limiar
+        matriz = self._matriz_simbolos(sinal)
+        integral = np.abs(self._integrar(matriz))
+        return (integral > limiar * self.taxa_amostragem).astype(np.int8)
+
+    def _esquema(self, esquema):
+        # Nome do esquema (como aparece nas interfaces) -> (modulador, demodulador)
+        esquemas = {
+            "NRZ-Polar": (self.nrz_polar, self.nrz_polar_decode),
+            "Manchester": (self.manchester, self.manchester_decode),
+            "Bipolar": (self.bipolar, self.bipolar_decode),
+        }
+        if esquema not in esquemas:
+            raise ValueError(f"Modulação digital desconhecida: {esquema}")
+        return esquemas[esquema]
+
+    def modular(self, esquema, bits):
+        # Modula pelo nome do esquema (como aparece nas interfaces)
+        modulador, _ = self._esquema(esquema)
+        return modulador(bits)
+
+    def demodular(self, esquema, sinal):
+        _, demodulador = self._esquema(esquema)
+        return demodulador(sinal)
+
+    def modular_stream(self, esquema, blocos_bits, amostras_por_bloco=4096):
+        # Modula um fluxo de blocos de bits e gera blocos de amostras de tamanho fixo (o último pode ser menor).
+        # A memória usada depende só do tamanho dos blocos, não do tamanho do fluxo
+        modulador, _ = self._esquema(esquema)
+
+        def sinais():
+            uns_anteriores = 0
+            for bits in blocos_bits:
+                bits = self._preparar_bits(bits)
+                if esquema == "Bipolar":
+                    # A alternância de polaridade do AMI continua de um bloco para o outro
+                    _, sinal = modulador(bits, uns_anteriores)
+                    uns_anteriores += int(np.count_nonzero(bits))
+                else:
+                    _, sinal = modulador(bits)
+                yield sinal
+
+        yield from _reagrupar_blocos(sinais(), amostras_por_bloco)
+
+    def demodular_stream(self, esquema, blocos_amostras):
+        # Demodula blocos de amostras de tamanho arbitrário e gera os bits de cada bloco.
+        # Amostras de um bit dividido entre dois blocos ficam guardadas até o bit se completar
+        _, demodulador = self._esquema(esquema)
+        for sinal in _alinhar_blocos(blocos_amostras, self.taxa_amostragem, incluir_resto=False):
+            yield demodulador(sinal)
+
+    def modular_lazy(self, esquema, bits):
+        # Sinal preguiçoso: guarda um índice por bit e uma tabela com a forma de onda de cada índice
+        bits = self._preparar_bits(bits)
+        self._esquema(esquema)
+        amostras = self.taxa_amostragem
+        if esquema == "NRZ-Polar":
+            # Índice 0: -V, índice 1: +V
+            tabela = np.array([[-self.amplitude] * amostras, [self.amplitude] * amostras])
+            simbolos = bits
+        elif esquema == "Manchester":
+            # Índice 0: -V -> +V, índice 1: +V -> -V
+            meio = amostras // 2
+            pulso = np.full(amostras, -self.amplitude)
+            pulso[:meio] = self.amplitude
+            tabela = np.stack([-pulso, pulso])
+            simbolos = bits
+        else:
+            # Índice 0: nível 0, índice 1: +V, índice 2: -V (alternância dos 1s)
+            tabela = np.repeat([[0], [self.amplitude], [-self.amplitude]], amostras, axis=1)
+            simbolos = np.where(bits == 1, 2 - np.cumsum(bits) % 2, 0)
+        return SinalLazy(simbolos, self._no_tipo(tabela))
+
+
+def _gray(valores):
+    # Código Gray binário refletido
+    return valores ^ (valores >> 1)
+
+
+class Constelacao:
+    # Símbolos decididos por vez na busca do ponto mais próximo (limita a matriz de distâncias)
+    SIMBOLOS_POR_LOTE = 4096
+
+    # Nome -> (tipo, número de pontos)
+    TIPOS = {
+        "BPSK": ("PSK", 2),
+        "QPSK": ("PSK", 4),
+        "8-PSK": ("PSK", 8),
+        "4-QAM": ("QAM", 4),
+        "8-QAM": ("8-QAM", 8),
+        "16-QAM": ("QAM", 16),
+        "64-QAM": ("QAM", 64),
+    }
 
-        tamanho_sinal = len(sinal)
+    def __init__(self, nome="8-QAM", amplitude=1, gray=False):
+        if nome not in self.TIPOS:
+            raise ValueError(f"Constelação desconhecida: {nome}")
+        tipo, num_pontos = self.TIPOS[nome]
+        self.nome = nome
+        self.amplitude = amplitude
+        self.gray = gray
+        self.bits_por_simbolo = _bits_por_simbolo(num_pontos)
+        self._grade = None
+
+        # Pontos na ordem "natural" das posições (ângulo crescente no PSK, grade linha a linha no QAM)
+        posicoes = np.arange(num_pontos)
+        if tipo == "PSK":
+            pontos = amplitude * np.exp(2j * np.pi * posicoes / num_pontos)
+            valores = _gray(posicoes) if gray else posicoes
+        elif tipo == "QAM":
+            # Grade quadrada com níveis ±1, ±3, ... em I e em Q; os bits altos escolhem I e os baixos Q
+            lado = 1 << (self.bits_por_simbolo // 2)
+            linha, coluna = np.divmod(posicoes, lado)
+            niveis = 2 * np.arange(lado) - (lado - 1)
+            pontos = amplitude * (niveis[linha] + 1j * niveis[coluna])
+            valores = _gray(linha) * lado + _gray(coluna) if gray else linha * lado + coluna
+            # Valor do símbolo em cada posição da grade, para decidir I e Q separadamente
+            self._grade = valores.reshape(lado, lado)
+        else:
+            # 8-QAM original do projeto: símbolo (b2,b1,b0) -> (amplitude_I, amplitude_Q)
+            if gray:
+                raise ValueError("Mapeamento Gray não disponível para a constelação 8-QAM")
+            a = amplitude
+            pontos = np.array([-a - 1j*a, -a + 1j*a, a - 1j*a, a + 1j*a,
+                               -2*a, -2j*a, 2*a, 2j*a])
+            valores = posicoes
+
+        # pontos[v] é o ponto transmitido para o símbolo de valor v
+        self.pontos = np.empty(num_pontos, dtype=np.complex128)
+        self.pontos[valores] = pontos
+
+    def __len__(self):
+        return len(self.pontos)
+
+    def simbolos(self, bits):
+        # Grupos de bits -> índices de símbolo
+        return _bits_para_simbolos(bits, self.bits_por_simbolo)
+
+    def mapear(self, bits):
+        # Mapeia os bits para os pontos complexos (I + jQ) com indexação direta
+        return self.pontos[self.simbolos(bits)]
+
+    def decidir(self, amostras):
+        # Símbolo do ponto mais próximo de cada amostra I + jQ
+        amostras = np.asarray(amostras)
+        if self._grade is not None:
+            # QAM quadrado: o nível mais próximo em I e em Q, arredondando na grade ±1, ±3, ...
+            lado = len(self._grade)
+            linha = np.clip(np.rint((amostras.real / self.amplitude + lado - 1) / 2), 0, lado - 1).astype(np.intp)
+            coluna = np.clip(np.rint((amostras.imag / self.amplitude + lado - 1) / 2), 0, lado - 1).astype(np.intp)
+            return self._grade[linha, coluna]
+
+        # Outras constelações: argmin sobre a matriz de distâncias (símbolos x pontos), um lote por vez
+        simbolos = np.empty(len(amostras), dtype=np.intp)
+        for inicio in range(0, len(amostras), self.SIMBOLOS_POR_LOTE):
+            lote = amostras[inicio:inicio + self.SIMBOLOS_POR_LOTE, np.newaxis] - self.pontos[np.newaxis, :]
+            simbolos[inicio:inicio + len(lote)] = np.argmin(lote.real ** 2 + lote.imag ** 2, axis=1)
+        return simbolos
+
+    def desmapear(self, amostras):
+        # Amostras I + jQ -> bits
+        return _simbolos_para_bits(self.decidir(amostras), self.bits_por_simbolo)
+
+
+class OsciladorNCO:
+    # Oscilador controlado numericamente: a frequência (em ciclos por símbolo) é constante dentro de cada símbolo
+    # e não precisa ser um número inteiro de ciclos por símbolo; a fase é contínua entre símbolos e entre chamadas.
+    # Como no acumulador de fase de um NCO em hardware, a fase é um inteiro de 64 bits em que 2^64 vale um ciclo:
+    # a soma inteira é exata e já dá a volta sozinha, então a fase não acumula erro de arredondamento em sinais
+    # longos e o resultado não depende de como o sinal é dividido entre chamadas
+    ESCALA = 2.0 ** 64
+
+    def __init__(self, taxa_amostragem=1000, fase_inicial=0.0):
+        self.taxa_amostragem = taxa_amostragem  # Amostras por símbolo; frequências em ciclos por símbolo
+        self.fase = fase_inicial
+
+    @property
+    def fase(self):
+        # Fase do início do próximo símbolo, em ciclos (de 0 a 1)
+        return float(self._acumulador) / self.ESCALA
+
+    @fase.setter
+    def fase(self, ciclos):
+        self._acumulador = self._palavras(ciclos)[()]
+
+    def _palavras(self, ciclos):
+        # Ciclos -> palavras de fase (só a parte fracionária importa)
+        palavras = np.mod(np.asarray(ciclos, dtype=np.float64), 1.0) * self.ESCALA
+        return np.where(palavras >= self.ESCALA, 0, palavras).astype(np.uint64)
+
+    def fases(self, frequencias):
+        # Fase (em ciclos) de cada amostra para uma sequência de frequências por símbolo: matriz (símbolos, amostras)
+        incrementos = self._palavras(np.asarray(frequencias, dtype=np.float64) / self.taxa_amostragem)
+        avancos = incrementos * np.uint64(self.taxa_amostragem)
+        inicios = np.cumsum(avancos, dtype=np.uint64) - avancos + self._acumulador
+        if len(avancos):
+            self._acumulador = (inicios[-1:] + avancos[-1:])[0]
+        fases = inicios[:, np.newaxis] + incrementos[:, np.newaxis] * np.arange(self.taxa_amostragem, dtype=np.uint64)
+        return fases / self.ESCALA
+
+    def gerar(self, frequencias, amplitudes=1):
+        # Amplitude por símbolo (ou uma única para todos)
+        amplitudes = np.asarray(amplitudes)[..., np.newaxis]
+        return amplitudes * np.sin(2 * np.pi * self.fases(frequencias))
+
+
+class DemoduladorMSK:
+    # Demodulador coerente de MSK, que acompanha a trajetória de fase conhecida do sinal.
+    # No limite do bit k a fase acumulada pelos tons (além da portadora) é θ_k, múltiplo de π/2 com θ_0 = 0:
+    # cos θ_k = ±1 nos k pares e sen θ_k = ±1 nos k ímpares. O sinal é o seno da portadora vezes cos θ(t)
+    # (canal I) mais o cosseno vezes sen θ(t) (canal Q), e em cada canal o sinal de θ_k forma um pulso
+    # meia-senoide nos 2 bits em volta do limite k. Cada limite é decidido pela correlação com esse pulso,
+    # como no BPSK, e o bit k (tom alto: θ sobe π/2) sai dos sinais decididos de θ_k e θ_k+1.
+    # O demodulador guarda o último limite, então o sinal pode chegar em blocos; finalizar() decide o último bit
+    def __init__(self, modulacao, freq_portadora=1, fase_inicial=0.0):
+        self.modulacao = modulacao
+        self.freq_portadora = freq_portadora
+        self.fase_inicial = fase_inicial  # Fase da portadora no início do sinal, em ciclos
+        self.referencias = modulacao._referencias_msk(freq_portadora)
+        self.indice = 0      # Bits já recebidos
+        self.estado = 1      # Sinal decidido para o limite do último bit recebido
+        self.subida = 0.0    # Correlação da metade do pulso do próximo limite que já chegou
+
+    def demodular(self, sinal):
+        # Bits que já podem ser decididos: todos os recebidos, menos o último
+        matriz = self.modulacao._matriz_simbolos(sinal)
+        if not len(matriz):
+            return np.zeros(0, dtype=np.int8)
+        indices = self.indice + np.arange(len(matriz))
+
+        # Projeções de cada bit no seno (I) e no cosseno (Q) da portadora, que começa o bit k na fase α_k
+        alfa = 2 * np.pi * np.mod(self.freq_portadora * indices + self.fase_inicial, 1.0)
+        seno, cosseno = np.sin(alfa)[:, np.newaxis], np.cos(alfa)[:, np.newaxis]
+        projecoes = self.modulacao._projetar(matriz, self.referencias)
+        canal_i = seno * projecoes[:, 0::2] + cosseno * projecoes[:, 1::2]
+        canal_q = cosseno * projecoes[:, 0::2] - seno * projecoes[:, 1::2]
+
+        # No bit k, a metade que desce pertence ao limite k e a que sobe ao limite k+1 (o outro canal)
+        par = indices % 2 == 0
+        desce = np.where(par, canal_i[:, 0], canal_q[:, 0])
+        sobe = np.where(par, canal_q[:, 1], canal_i[:, 1])
+        decisao = np.concatenate([[self.subida], sobe[:-1]]) + desce
+        estados = np.where(decisao >= 0, 1, -1)
+        if self.indice == 0:
+            estados[0] = 1  # θ_0 = 0
+
+        # Bit j: θ_j+1 = θ_j ± π/2; com o tom alto, cos θ_j = sen θ_j+1 (j par) ou sen θ_j = -cos θ_j+1 (j ímpar)
+        anteriores = np.concatenate([[self.estado], estados[:-1]])
+        sinais_bit = np.where((indices - 1) % 2 == 0, 1, -1)
+        bits = (anteriores * estados * sinais_bit > 0).astype(np.int8)
+        if self.indice == 0:
+            bits = bits[1:]
+
+        self.estado, self.subida = estados[-1], sobe[-1]
+        self.indice += len(matriz)
+        return bits
 
-        # Loop com metade do tamanho da array do sinal (interagir de dois em dois)
-        for i in range(0, tamanho_sinal/2):
-            if sinal[i] == -self.amplitude and sinal[i+1] == self.amplitude:  # Essa função depende de como vamos implementar o receptor e transmissor
-                bits.append(0)                                                # O ideal nesse caso seria passar parametros iguais para inicializacao da
-            elif sinal[i] == self.amplitude and sinal[i+1] == -self.amplitude:  # classe tanto no receptor como no transmissor
-                bits.append(1)
+    def finalizar(self):
+        # O último bit usa só a metade do pulso do limite final que foi transmitida
+        if self.indice == 0:
+            return np.zeros(0, dtype=np.int8)
+        final = 1 if self.subida >= 0 else -1
+        sinal_bit = 1 if (self.indice - 1) % 2 == 0 else -1
+        return np.array([self.estado * final * sinal_bit > 0], dtype=np.int8)
 
-        return bits
 
-    def bipolar_decode(self, sinal):
-        # Inicializa o vetor de bits
-        bits = []
+class ModulacaoPortadora:
+    # Esquemas aceitos por modular/demodular e pelas versões em fluxo (os três primeiros usam o OsciladorNCO)
+    ESQUEMAS = ("CPFSK", "MSK", "ASK-NCO", "ASK", "FSK", "MFSK") + tuple(Constelacao.TIPOS)
 
-        for amplitude in sinal:
-            if amplitude == 0: 
-                bits.append(0)
-            else:               # Tanto negativo quanto positivo equivalem ao bit 1
-                bits.append(1)
-        
-        return bits
+    # Sinais em np.int16 usam ponto fixo com 11 bits de fração (faixa de ±16 vezes a unidade)
+    BITS_FRACAO_INT16 = 11
 
+    # Número de símbolos correlacionados por vez quando o sinal precisa ser convertido de tipo
+    SIMBOLOS_POR_LOTE = 4096
 
-class ModulacaoPortadora:
-    def __init__(self, taxa_amostragem=1000, amplitude=1):
+    def __init__(self, taxa_amostragem=1000, amplitude=1, dtype=np.float64):
         self.taxa_amostragem = taxa_amostragem
         self.amplitude = amplitude
+        # Tipo das amostras geradas: np.float64, np.float32 ou np.int16 (ponto fixo)
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float64, np.float32, np.int16):
+            raise ValueError(f"Tipo de amostra não suportado: {self.dtype}")
+        # Cache das tabelas de formas de onda por símbolo
+        self._tabelas = {}
+
+    def _tabela_formas_onda(self, chave, gerar, referencia=False):
+        # Cada tabela tem uma linha por símbolo com as amostras da portadora daquele símbolo.
+        # Ela é calculada uma única vez por (taxa_amostragem, amplitude, parâmetros da modulação).
+        # Tabelas de referência dos demoduladores nunca são quantizadas
+        chave = (self.taxa_amostragem, self.amplitude, self.dtype, referencia) + chave
+        tabela = self._tabelas.get(chave)
+        if tabela is None:
+            t = np.linspace(0, 1, self.taxa_amostragem)  # Tempo para cada símbolo
+            tabela = np.asarray(gerar(t), dtype=np.float64)
+            if referencia:
+                tabela = tabela.astype(self._tipo_calculo())
+            else:
+                tabela = self._converter_amostras(tabela)
+            tabela.setflags(write=False)
+            self._tabelas[chave] = tabela
+        return tabela
+
+    def _tipo_calculo(self):
+        # Sinais compactos são demodulados em float32, o resto em float64
+        return np.float64 if self.dtype == np.float64 else np.float32
+
+    def _converter_amostras(self, tabela):
+        if self.dtype == np.int16:
+            escala = 1 << self.BITS_FRACAO_INT16
+            quantizada = np.round(tabela * escala)
+            if np.abs(quantizada).max(initial=0) > np.iinfo(np.int16).max:
+                raise ValueError(f"Amplitude {self.amplitude} excede a faixa do ponto fixo int16")
+            return quantizada.astype(np.int16)
+        return tabela.astype(self.dtype)
+
+    def _matriz_simbolos(self, sinal):
+        # Organiza o sinal como uma matriz (símbolos, amostras_por_simbolo), sem copiar as amostras
+        amostras_por_simbolo = self.taxa_amostragem
+        num_simbolos = len(sinal) // amostras_por_simbolo
+        return np.asarray(sinal)[:num_simbolos * amostras_por_simbolo].reshape(num_simbolos, amostras_por_simbolo)
+
+    def _correlacionar(self, matriz, frequencias):
+        # Correlação de cada símbolo com o banco de referências dos tons
+        return self._projetar(matriz, self._referencias_correlador(frequencias))
+
+    def _projetar(self, matriz, referencias):
+        # Correlação de cada símbolo com cada coluna das referências, na unidade de amplitude do sinal.
+        # Sinais float64/float32 são multiplicados direto; outros tipos (ex.: int16 em ponto fixo)
+        # são convertidos um lote de símbolos por vez, nunca o array inteiro
+        if matriz.dtype == referencias.dtype:
+            return matriz @ referencias
+        if matriz.dtype.kind in "iu":
+            referencias = referencias * referencias.dtype.type(2.0 ** -self.BITS_FRACAO_INT16)
+        correlacoes = np.empty((len(matriz), referencias.shape[1]), dtype=referencias.dtype)
+        for inicio in range(0, len(matriz), self.SIMBOLOS_POR_LOTE):
+            lote = matriz[inicio:inicio + self.SIMBOLOS_POR_LOTE]
+            np.matmul(lote.astype(referencias.dtype), referencias, out=correlacoes[inicio:inicio + len(lote)])
+        return correlacoes
+
+    def _montar_sinal(self, tabela, simbolos):
+        # Monta o sinal inteiro com um único gather na tabela, direto num array pré-alocado
+        simbolos = np.asarray(simbolos, dtype=np.intp)
+        sinal = np.empty((len(simbolos), tabela.shape[1]), dtype=tabela.dtype)
+        np.take(tabela, simbolos, axis=0, out=sinal)
+        return sinal.reshape(-1)
+
+    def _tabela_ask(self, freq_portadora):
+        # Símbolo 0: sinal nulo, símbolo 1: seno com a frequência e a amplitude dadas
+        return self._tabela_formas_onda(
+            ("ASK", freq_portadora),
+            lambda t: [np.zeros_like(t), self.amplitude * np.sin(2 * np.pi * freq_portadora * t)])
+
+    def _tabela_fsk(self, frequencias):
+        # Símbolo i: seno com a i-ésima frequência (no FSK binário, bit 0 -> freq_low e bit 1 -> freq_high)
+        frequencias = tuple(frequencias)
+        return self._tabela_formas_onda(
+            ("FSK",) + frequencias,
+            lambda t: self.amplitude * np.sin(2 * np.pi * np.array(frequencias)[:, np.newaxis] * t))
+
+    def _referencias_correlador(self, frequencias):
+        # Banco de correlatores: um cosseno e um seno de referência por tom.
+        # Guardado já transposto, (amostras, 2*M), para a multiplicação de matrizes
+        frequencias = tuple(frequencias)
+
+        def gerar(t):
+            fase = 2 * np.pi * np.array(frequencias)[:, np.newaxis] * t
+            return np.concatenate([np.cos(fase), np.sin(fase)]).T
+
+        return self._tabela_formas_onda(("correlador",) + frequencias, gerar, referencia=True)
+
+    def _referencias_msk(self, freq_portadora):
+        # Referências do MSK coerente, (amostras, 4): cosseno e seno da portadora multiplicados pela metade
+        # que desce (cos(πτ/2)) e pela metade que sobe (sen(πτ/2)) do pulso meia-senoide.
+        # O tempo é o mesmo do OsciladorNCO (n / amostras_por_simbolo)
+        def gerar(_):
+            tau = np.arange(self.taxa_amostragem) / self.taxa_amostragem
+            cosseno, seno = np.cos(2 * np.pi * freq_portadora * tau), np.sin(2 * np.pi * freq_portadora * tau)
+            desce, sobe = np.cos(np.pi * tau / 2), np.sin(np.pi * tau / 2)
+            return np.stack([cosseno * desce, seno * desce, cosseno * sobe, seno * sobe], axis=1)
+
+        return self._tabela_formas_onda(("MSK coerente", freq_portadora), gerar, referencia=True)
+
+    def constelacao(self, nome="8-QAM", gray=False):
+        # Constelações são imutáveis; guardadas no mesmo cache das tabelas
+        chave = (self.amplitude, "constelacao", nome, gray)
+        constelacao = self._tabelas.get(chave)
+        if constelacao is None:
+            constelacao = Constelacao(nome, self.amplitude, gray)
+            self._tabelas[chave] = constelacao
+        return constelacao
+
+    def _tabela_constelacao(self, constelacao, freq_portadora):
+        def gerar(t):
+            pontos = constelacao.pontos[:, np.newaxis]
+            # Componentes I e Q de cada símbolo combinadas na forma de onda final
+            return (pontos.real * np.cos(2 * np.pi * freq_portadora * t)
+                    - pontos.imag * np.sin(2 * np.pi * freq_portadora * t))
+        return self._tabela_formas_onda((constelacao.nome, constelacao.gray, freq_portadora), gerar)
 
     def ask(self, bits, freq_portadora=1):
+        bits = np.asarray(bits, dtype=np.int8)
+
         # Calcula o vetor do tempo
         tempo = np.linspace(0, len(bits), len(bits) * self.taxa_amostragem)
 
-        # Inicializa o vetor de sinais
-        sinal = []
-
-        for bit in bits:
-            if bit:
-                # Gerar seno com a frequência dada e a amplitude
-                t = np.linspace(0, 1, self.taxa_amostragem)  # Tempo para cada bit
-                sinal.extend(self.amplitude * np.sin(2 * np.pi * freq_portadora * t))  # Sinal para bit "1"
-            else:
-                # Para bit "0", sinal é 0
-                t = np.linspace(0, 1, self.taxa_amostragem)  # Tempo para cada bit
-                sinal.extend(np.zeros_like(t))  # Sinal para bit "0"
-
-        sinal_modulado = np.array(sinal)
+        sinal_modulado = self._montar_sinal(self._tabela_ask(freq_portadora), bits)
 
         return tempo, sinal_modulado
 
     def fsk(self, bits, freq_low=1, freq_high=2):
+        bits = np.asarray(bits, dtype=np.int8)
+
         # Calcula o vetor do tempo
         tempo = np.linspace(0, len(bits), len(bits) * self.taxa_amostragem)
 
-        # Inicializa o vetor de sinais
-        sinal = []
+        sinal_modulado = self._montar_sinal(self._tabela_fsk((freq_low, freq_high)), bits)
 
-        for bit in bits:
-            if bit:
-                # Gerar seno com a frequência maior dada e a amplitude
-                t = np.linspace(0, 1, self.taxa_amostragem)  # Tempo para cada bit
-                sinal.extend(self.amplitude * np.sin(2 * np.pi * freq_high * t))  # Sinal para bit "1"
-            else:
-                # Para bit "0", sinal é 0 com a frequência mais baixa
-                t = np.linspace(0, 1, self.taxa_amostragem)  # Tempo para cada bit
-                sinal.extend(self.amplitude * np.sin(2 * np.pi * freq_low * t))   # Sinal para bit "0"
-
-        sinal_modulado = np.array(sinal)
-
-        return tempo, sinal
-
-    def qam8(self, bits):
-        # Faz uma cópia dos bits para não modificar a entrada original
-        bits_padded = bits.copy()
-        
-        # Calcula quantos bits faltam para completar um múltiplo de 3
-        padding_needed = (3 - len(bits) % 3) % 3
-        
-        # Adiciona zeros como padding se necessário
-        if padding_needed > 0:
-            bits_padded.extend([0] * padding_needed)
-
-        # Define os pontos da constelação 8-QAM
-        # Formato: {(b2,b1,b0): (amplitude_I, amplitude_Q)}
-        constelacao = {
-            (0,0,0): (-self.amplitude, -self.amplitude),
-            (0,0,1): (-self.amplitude, self.amplitude),
-            (0,1,0): (self.amplitude, -self.amplitude),
-            (0,1,1): (self.amplitude, self.amplitude),
-            (1,0,0): (-2*self.amplitude, 0),
-            (1,0,1): (0, -2*self.amplitude),
-            (1,1,0): (2*self.amplitude, 0),
-            (1,1,1): (0, 2*self.amplitude)
-        }
+        return tempo, sinal_modulado
+
+    def mfsk(self, bits, frequencias=(1, 2, 3, 4)):
+        # FSK M-ário: cada grupo de log2(M) bits escolhe um dos M tons
+        simbolos = _bits_para_simbolos(bits, _bits_por_simbolo(len(frequencias)))
 
         # Calcula o vetor do tempo
-        tempo = np.linspace(0, len(bits_padded)//3, (len(bits_padded)//3) * self.taxa_amostragem)
-        
-        # Frequência da portadora (pode ser ajustada conforme necessário)
-        freq_portadora = 1
-        
-        # Inicializa os vetores de sinal I e Q
-        sinal_i = []
-        sinal_q = []
-        
-        # Processa os bits em grupos de 3
-        for i in range(0, len(bits_padded), 3):
-            # Pega 3 bits para formar um símbolo
-            simbolo = tuple(bits_padded[i:i+3])
-            
-            # Obtém as amplitudes I e Q do símbolo
-            amp_i, amp_q = constelacao[simbolo]
-            
-            # Gera o tempo para um símbolo
-            t = np.linspace(0, 1, self.taxa_amostragem)
-            
-            # Gera as componentes I e Q do sinal
-            sinal_i.extend(amp_i * np.cos(2 * np.pi * freq_portadora * t))
-            sinal_q.extend(amp_q * np.sin(2 * np.pi * freq_portadora * t))
-        
-        # Combina as componentes I e Q para formar o sinal modulado
-        sinal_modulado = np.array(sinal_i) - np.array(sinal_q)
-        
+        tempo = np.linspace(0, len(simbolos), len(simbolos) * self.taxa_amostragem)
+
+        sinal_modulado = self._montar_sinal(self._tabela_fsk(frequencias), simbolos)
+
         return tempo, sinal_modulado
 
-    def ask_decode(self, sinal):
+    def qam8(self, bits, freq_portadora=1):
+        return self.modular_constelacao(bits, "8-QAM", freq_portadora=freq_portadora)
 
-        # Inicializa o vetor de bits
-        bits = []
+    def modular_constelacao(self, bits, nome="16-QAM", gray=False, freq_portadora=1):
+        constelacao = self.constelacao(nome, gray)
 
-        for amplitude in sinal:
-            if ampltiude == 0:
-                bits.append(0)
-            else:
-                bits.append(1)
+        # Cada grupo de bits, completado com zeros, vira o índice do símbolo na tabela
+        simbolos = constelacao.simbolos(bits)
 
-        return bits
+        # Calcula o vetor do tempo
+        tempo = np.linspace(0, len(simbolos), len(simbolos) * self.taxa_amostragem)
+
+        sinal_modulado = self._montar_sinal(self._tabela_constelacao(constelacao, freq_portadora), simbolos)
+
+        return tempo, sinal_modulado
+
+    def _sinal_nco(self, oscilador, frequencias, amplitudes):
+        # Todas as amostras de uma vez, a partir da frequência e da amplitude de cada símbolo
+        return self._converter_amostras(oscilador.gerar(frequencias, amplitudes).reshape(-1))
+
+    def _simbolos_nco(self, esquema, parametros):
+        # Esquemas de fase contínua -> (frequência por símbolo, amplitude por símbolo)
+        freq_portadora = parametros.get("freq_portadora", 1)
+        if esquema == "CPFSK":
+            frequencias = (parametros.get("freq_low", 1), parametros.get("freq_high", 2))
+            return np.array(frequencias), np.full(2, self.amplitude)
+        if esquema == "MSK":
+            # CPFSK com índice de modulação 0,5: os tons ficam a ±1/4 de ciclo por bit da portadora
+            return np.array([freq_portadora - 0.25, freq_portadora + 0.25]), np.full(2, self.amplitude)
+        if esquema == "ASK-NCO":
+            return np.full(2, freq_portadora), np.array([0, self.amplitude])
+        raise ValueError(f"Modulação por portadora desconhecida: {esquema}")
+
+    def _modular_nco(self, esquema, bits, oscilador=None, **parametros):
+        bits = np.asarray(bits, dtype=np.intp)
+        oscilador = OsciladorNCO(self.taxa_amostragem) if oscilador is None else oscilador
+        frequencias, amplitudes = self._simbolos_nco(esquema, parametros)
+
+        # Calcula o vetor do tempo
+        tempo = np.linspace(0, len(bits), len(bits) * self.taxa_amostragem)
+
+        sinal_modulado = self._sinal_nco(oscilador, frequencias[bits], amplitudes[bits])
+
+        return tempo, sinal_modulado
+
+    def cpfsk(self, bits, freq_low=1, freq_high=2, oscilador=None):
+        # FSK de fase contínua: a portadora não reinicia a cada bit
+        return self._modular_nco("CPFSK", bits, oscilador, freq_low=freq_low, freq_high=freq_high)
+
+    def msk(self, bits, freq_portadora=1, oscilador=None):
+        return self._modular_nco("MSK", bits, oscilador, freq_portadora=freq_portadora)
+
+    def ask_nco(self, bits, freq_portadora=1, oscilador=None):
+        # ASK com portadora contínua e frequência arbitrária (não precisa de ciclos inteiros por bit)
+        return self._modular_nco("ASK-NCO", bits, oscilador, freq_portadora=freq_portadora)
+
+    def ask_decode(self, sinal, freq_portadora=1):
+        matriz = self._matriz_simbolos(sinal)
+
+        # Amplitude da portadora em cada bit, estimada pela correlação com o cosseno e o seno da portadora.
+        # O bit é 1 quando a amplitude passa da metade da amplitude do bit "1"
+        correlacoes = self._correlacionar(matriz, (freq_portadora,))
+        amplitude = 2 * np.hypot(correlacoes[:, 0], correlacoes[:, 1]) / self.taxa_amostragem
+
+        return (amplitude > self.amplitude / 2).astype(np.int8)
     
     def fsk_decode(self, sinal, freq_low=1, freq_high=2):
+        return self.mfsk_decode(sinal, (freq_low, freq_high))
 
-        # Dividindo o sinal nos intervalos correspondentes a cada bit
-        bits = []
-        amostras_por_bit = self.taxa_amostragem  # Número de amostras por bit
-        num_bits = len(sinal) // amostras_por_bit  # Total de bits no sinal
-
-        for i in range(num_bits):
-            # Extrai a parte do sinal correspondente ao bit atual
-            segmento = sinal[i * amostras_por_bit:(i + 1) * amostras_por_bit]
-            
-            # Aplica a Transformada de Fourier para identificar a frequência predominante
-            fft_result = np.fft.fft(segmento)
-            fft_frequencies = np.fft.fftfreq(len(segmento), d=1/self.taxa_amostragem)
-            
-            # Identifica a frequência dominante (ignora a parte negativa das frequências)
-            dominante = abs(fft_frequencies[np.argmax(abs(fft_result))])
-            
-            # Decodifica o bit com base na frequência dominante
-            if abs(dominante - freq_high) < abs(dominante - freq_low):
-                bits.append(1)
-            else:
-                bits.append(0)
+    def msk_decode(self, sinal, freq_portadora=1, fase_inicial=0.0):
+        # Demodulação coerente (o correlator de energia do FSK perde muito no MSK, cujos tons
+        # estão a só 0,5 ciclo por bit um do outro)
+        demodulador = DemoduladorMSK(self, freq_portadora, fase_inicial)
+        return np.concatenate([demodulador.demodular(sinal), demodulador.finalizar()])
 
-        return bits
+    def mfsk_decode(self, sinal, frequencias=(1, 2, 3, 4)):
+        bits_por_simbolo = _bits_por_simbolo(len(frequencias))
+
+        matriz = self._matriz_simbolos(sinal)
+
+        # Um único produto de matrizes correlaciona todos os símbolos com todos os tons de referência.
+        # A energia I² + Q² de cada tom não depende da fase, e o tom de maior energia decide o símbolo
+        correlacoes = self._correlacionar(matriz, frequencias)
+        num_tons = len(frequencias)
+        energia = correlacoes[:, :num_tons] ** 2 + correlacoes[:, num_tons:] ** 2
+        simbolos = np.argmax(energia, axis=1)
+
+        return _simbolos_para_bits(simbolos, bits_por_simbolo)
 
     def qam8_decode(self, sinal, freq_portadora=1):
+        return self.demodular_constelacao(sinal, "8-QAM", freq_portadora=freq_portadora)
+
+    def demodular_constelacao(self, sinal, nome="16-QAM", gray=False, freq_portadora=1):
+        constelacao = self.constelacao(nome, gray)
+
+        matriz = self._matriz_simbolos(sinal)
+
+        # Projeção de todos os símbolos de uma vez sobre o cosseno (I) e o seno (Q) da portadora
+        projecoes = self._correlacionar(matriz, (freq_portadora,))
+        componente_i = 2 * projecoes[:, 0] / self.taxa_amostragem
+        componente_q = -2 * projecoes[:, 1] / self.taxa_amostragem
+
+        # Ponto da constelação mais próximo de cada símbolo
+        return constelacao.desmapear(componente_i + 1j * componente_q)
+
+    def _esquema(self, esquema, parametros):
+        # Nome do esquema -> (bits por símbolo, tabela de formas de onda, demodulador).
+        # Esquemas de fase contínua (NCO) não têm tabela: a forma de onda depende da fase acumulada
+        freq_portadora = parametros.get("freq_portadora", 1)
+        if esquema == "CPFSK":
+            # A energia do correlator não depende da fase, então o mesmo banco decide os tons contínuos
+            frequencias = tuple(self._simbolos_nco(esquema, parametros)[0])
+            return 1, None, lambda sinal: self.mfsk_decode(sinal, frequencias)
+        if esquema == "MSK":
+            return 1, None, lambda sinal: self.msk_decode(sinal, freq_portadora)
+        if esquema == "ASK-NCO":
+            return 1, None, lambda sinal: self.ask_decode(sinal, freq_portadora)
+        if esquema == "ASK":
+            return (1, self._tabela_ask(freq_portadora),
+                    lambda sinal: self.ask_decode(sinal, freq_portadora))
+        if esquema == "FSK":
+            frequencias = (parametros.get("freq_low", 1), parametros.get("freq_high", 2))
+            return (1, self._tabela_fsk(frequencias),
+                    lambda sinal: self.mfsk_decode(sinal, frequencias))
+        if esquema == "MFSK":
+            frequencias = tuple(parametros.get("frequencias", (1, 2, 3, 4)))
+            return (_bits_por_simbolo(len(frequencias)), self._tabela_fsk(frequencias),
+                    lambda sinal: self.mfsk_decode(sinal, frequencias))
+        if esquema in Constelacao.TIPOS:
+            gray = parametros.get("gray", False)
+            constelacao = self.constelacao(esquema, gray)
+            return (constelacao.bits_por_simbolo, self._tabela_constelacao(constelacao, freq_portadora),
+                    lambda sinal: self.demodular_constelacao(sinal, esquema, gray, freq_portadora))
+        raise ValueError(f"Modulação por portadora desconhecida: {esquema}")
+
+    def _gerador(self, esquema, parametros):
+        # Função símbolos -> amostras do esquema. Nos esquemas com tabela cada símbolo começa a portadora
+        # na mesma fase; nos esquemas NCO um único oscilador atravessa todas as chamadas da função
+        bits_por_simbolo, tabela, _ = self._esquema(esquema, parametros)
+        if tabela is None:
+            oscilador = OsciladorNCO(self.taxa_amostragem)
+            frequencias, amplitudes = self._simbolos_nco(esquema, parametros)
+
+            def gerar(simbolos):
+                return self._sinal_nco(oscilador, frequencias[simbolos], amplitudes[simbolos])
+        else:
+            def gerar(simbolos):
+                return self._montar_sinal(tabela, simbolos)
+        return bits_por_simbolo, gerar
+
+    def modular(self, esquema, bits, **parametros):
+        # Modula pelo nome do esquema; devolve (tempo, sinal) como os métodos específicos
+        bits_por_simbolo, gerar = self._gerador(esquema, parametros)
+        simbolos = _bits_para_simbolos(bits, bits_por_simbolo)
 
-        # Define os pontos da constelação 8-QAM
-        constelacao = {
-            (-self.amplitude, -self.amplitude): (0, 0, 0),
-            (-self.amplitude, self.amplitude): (0, 0, 1),
-            (self.amplitude, -self.amplitude): (0, 1, 0),
-            (self.amplitude, self.amplitude): (0, 1, 1),
-            (-2*self.amplitude, 0): (1, 0, 0),
-            (0, -2*self.amplitude): (1, 0, 1),
-            (2*self.amplitude, 0): (1, 1, 0),
-            (0, 2*self.amplitude): (1, 1, 1)
-        }
+        # Calcula o vetor do tempo
+        tempo = np.linspace(0, len(simbolos), len(simbolos) * self.taxa_amostragem)
+
+        return tempo, gerar(simbolos)
+
+    def demodular(self, esquema, sinal, **parametros):
+        _, _, demodulador = self._esquema(esquema, parametros)
+        return demodulador(sinal)
+
+    def modular_stream(self, esquema, blocos_bits, amostras_por_bloco=4096, **parametros):
+        # Modula um fluxo de blocos de bits e gera blocos de amostras de tamanho fixo (o último pode ser menor).
+        # Bits de um símbolo dividido entre dois blocos ficam guardados até o símbolo se completar.
+        # Nos esquemas NCO a fase continua de um bloco para o outro, então o fluxo é idêntico
+        # à modulação do vetor inteiro
+        bits_por_simbolo, gerar = self._gerador(esquema, parametros)
+
+        def sinais():
+            for bits in _alinhar_blocos(blocos_bits, bits_por_simbolo, incluir_resto=True):
+                yield gerar(_bits_para_simbolos(bits, bits_por_simbolo))
+
+        yield from _reagrupar_blocos(sinais(), amostras_por_bloco)
+
+    def demodular_stream(self, esquema, blocos_amostras, **parametros):
+        # Demodula blocos de amostras de tamanho arbitrário e gera os bits de cada bloco
+        _, _, demodulador = self._esquema(esquema, parametros)
+        blocos = _alinhar_blocos(blocos_amostras, self.taxa_amostragem, incluir_resto=False)
+        if esquema == "MSK":
+            # O último bit de cada bloco só é decidido com o início do bloco seguinte
+            demodulador_msk = DemoduladorMSK(self, parametros.get("freq_portadora", 1))
+            for sinal in blocos:
+                yield demodulador_msk.demodular(sinal)
+            yield demodulador_msk.finalizar()
+            return
+        for sinal in blocos:
+            yield demodulador(sinal)
+
+    def modular_lazy(self, esquema, bits, **parametros):
+        # Sinal preguiçoso: só os símbolos e a tabela de formas de onda (já em cache) são guardados
+        bits_por_simbolo, tabela, _ = self._esquema(esquema, parametros)
+        if tabela is None:
+            raise ValueError(f"{esquema} depende da fase acumulada e não tem forma de onda fixa por símbolo")
+        return SinalLazy(_bits_para_simbolos(bits, bits_por_simbolo), tabela)
+
+
+class ModulacaoOFDM:
+    # OFDM real: cada subportadora k = 1..N carrega um ponto da constelação e o símbolo OFDM é a IFFT real
+    # (simetria hermitiana) de 2*(N+1) amostras, precedida do prefixo cíclico.
+    # Cada subportadora é uma senoide com amplitude |ponto| e fase arg(ponto)
+    def __init__(self, num_subportadoras=64, prefixo_ciclico=16, constelacao="16-QAM", gray=False,
+                 amplitude=1, dtype=np.float64):
+        if num_subportadoras < 1:
+            raise ValueError(f"Número de subportadoras inválido: {num_subportadoras}")
+        self.num_subportadoras = num_subportadoras
+        self.tamanho_fft = 2 * (num_subportadoras + 1)  # Subportadoras 0 (DC) e N+1 (Nyquist) ficam vazias
+        if not 0 <= prefixo_ciclico <= self.tamanho_fft:
+            raise ValueError(f"Prefixo cíclico deve estar entre 0 e {self.tamanho_fft} amostras")
+        self.prefixo_ciclico = prefixo_ciclico
+        self.constelacao = Constelacao(constelacao, amplitude, gray)
+        self.amplitude = amplitude
+        # A soma das subportadoras não cabe no ponto fixo int16 usado na ModulacaoPortadora
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float64, np.float32):
+            raise ValueError(f"Tipo de amostra não suportado: {self.dtype}")
+
+    @property
+    def amostras_por_simbolo(self):
+        return self.tamanho_fft + self.prefixo_ciclico
+
+    @property
+    def bits_por_simbolo(self):
+        return self.num_subportadoras * self.constelacao.bits_por_simbolo
+
+    def modular(self, bits):
+        # Bits -> pontos da constelação, uma linha de N subportadoras por símbolo OFDM (completando com zeros)
+        bits = np.asarray(bits, dtype=np.int8)
+        num_simbolos = -(-len(bits) // self.bits_por_simbolo)
+        bits = np.concatenate([bits, np.zeros(num_simbolos * self.bits_por_simbolo - len(bits), dtype=np.int8)])
+        pontos = self.constelacao.mapear(bits)
+        espectro = np.zeros((num_simbolos, self.num_subportadoras + 2), dtype=np.complex128)
+        espectro[:, 1:-1] = pontos.reshape(num_simbolos, self.num_subportadoras)
+
+        # Uma única IFFT real para todos os símbolos, escrita direto depois do espaço do prefixo cíclico.
+        # O fator N_fft/2 faz cada subportadora ter a amplitude do seu ponto
+        sinal = np.empty((num_simbolos, self.amostras_por_simbolo), dtype=self.dtype)
+        sinal[:, self.prefixo_ciclico:] = np.fft.irfft(espectro, n=self.tamanho_fft, axis=1) * (self.tamanho_fft / 2)
+        sinal[:, :self.prefixo_ciclico] = sinal[:, self.tamanho_fft:]
 
-        # Número de amostras por símbolo
-        amostras_por_simbolo = self.taxa_amostragem
+        # Calcula o vetor do tempo
+        tempo = np.linspace(0, num_simbolos, num_simbolos * self.amostras_por_simbolo)
 
-        # Inicializa o vetor de bits decodificados
-        bits = []
+        return tempo, sinal.reshape(-1)
 
-        # Itera sobre o sinal recebido, símbolo por símbolo
-        for i in range(0, len(sinal), amostras_por_simbolo):
-            # Extrai o segmento do sinal correspondente ao símbolo atual
-            segmento = sinal[i:i+amostras_por_simbolo]
-            
-            # Gera o tempo para o símbolo
-            t = np.linspace(0, 1, self.taxa_amostragem)
+    def demodular(self, sinal):
+        # Descarta o prefixo cíclico e faz uma única FFT real sobre a matriz (símbolos, amostras)
+        num_simbolos = len(sinal) // self.amostras_por_simbolo
+        matriz = np.asarray(sinal)[:num_simbolos * self.amostras_por_simbolo].reshape(
+            num_simbolos, self.amostras_por_simbolo)
+        espectro = np.fft.rfft(matriz[:, self.prefixo_ciclico:], axis=1)
+        pontos = espectro[:, 1:-1] / (self.tamanho_fft / 2)
 
-            # Reconstroi as componentes I e Q do sinal
-            componente_i = 2 * np.mean(segmento * np.cos(2 * np.pi * freq_portadora * t))
-            componente_q = -2 * np.mean(segmento * np.sin(2 * np.pi * freq_portadora * t))
-            
-            # Encontra o ponto da constelação mais próximo
-            ponto_constelacao = min(constelacao.keys(), 
-                                    key=lambda p: np.sqrt((componente_i - p[0])**2 + (componente_q - p[1])**2))
+        # Ponto da constelação mais próximo em cada subportadora
+        return self.constelacao.desmapear(pontos.reshape(-1))
 
-            # Adiciona os bits correspondentes ao símbolo decodificado
-            bits.extend(constelacao[ponto_constelacao])
+    def modular_stream(self, blocos_bits, amostras_por_bloco=4096):
+        # Modula um fluxo de blocos de bits; só os bits de um símbolo OFDM incompleto ficam guardados
+        def sinais():
+            for bits in _alinhar_blocos(blocos_bits, self.bits_por_simbolo, incluir_resto=True):
+                yield self.modular(bits)[1]
 
-        return bits
+        yield from _reagrupar_blocos(sinais(), amostras_por_bloco)
+
+    def demodular_stream(self, blocos_amostras):
+        # Demodula blocos de amostras de tamanho arbitrário, símbolo OFDM inteiro por símbolo OFDM inteiro
+        for sinal in _alinhar_blocos(blocos_amostras, self.amostras_por_simbolo, incluir_resto=False):
+            yield self.demodular(sinal)
 
 
 
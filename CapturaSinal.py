@@ -0,0 +1,162 @@
+import json
+import os
+
+import numpy as np
+
+from CamadaFisica import ModulacaoDigital, ModulacaoPortadora
+
+ARQUIVO_INDICE = "indice.json"
+
+
+class GravadorCaptura:
+    """ Grava amostras moduladas em arquivos brutos de tamanho limitado e um índice JSON """
+    def __init__(self, diretorio, esquema, taxa_amostragem, dtype, amplitude=1, amostras_por_arquivo=1 << 24,
+                 **parametros):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.dtype = np.dtype(dtype)
+        self.amostras_por_arquivo = amostras_por_arquivo
+        self.indice = {
+            "esquema": esquema,
+            "taxa_amostragem": taxa_amostragem,
+            "amplitude": amplitude,
+            "dtype": self.dtype.str,
+            "parametros": parametros,
+            "arquivos": [],
+            "quadros": [],
+        }
+        self.total_amostras = 0
+        self._arquivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def escrever(self, amostras):
+        """ Acrescenta amostras ao fim da captura, abrindo um novo arquivo quando o atual enche """
+        amostras = np.ascontiguousarray(amostras, dtype=self.dtype)
+        while len(amostras):
+            if self._arquivo is None or self.indice["arquivos"][-1]["amostras"] == self.amostras_por_arquivo:
+                self._abrir_arquivo()
+            atual = self.indice["arquivos"][-1]
+            cabem = self.amostras_por_arquivo - atual["amostras"]
+            pedaco, amostras = amostras[:cabem], amostras[cabem:]
+            pedaco.tofile(self._arquivo)
+            atual["amostras"] += len(pedaco)
+            self.total_amostras += len(pedaco)
+
+    def escrever_quadro(self, amostras):
+        """ Grava um quadro e registra sua posição no índice """
+        self.indice["quadros"].append({"inicio": self.total_amostras, "amostras": len(amostras)})
+        self.escrever(amostras)
+
+    def _abrir_arquivo(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+        nome = f"bloco_{len(self.indice['arquivos']):05d}.raw"
+        self._arquivo = open(os.path.join(self.diretorio, nome), "wb")
+        self.indice["arquivos"].append({"nome": nome, "amostras": 0})
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        with open(os.path.join(self.diretorio, ARQUIVO_INDICE), "w") as arquivo:
+            json.dump(self.indice, arquivo, indent=2)
+
+
+class LeitorCaptura:
+    """ Lê uma captura com np.memmap: acesso aleatório sem copiar e sem carregar os arquivos na memória """
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, ARQUIVO_INDICE)) as arquivo:
+            self.indice = json.load(arquivo)
+        self.dtype = np.dtype(self.indice["dtype"])
+        self.esquema = self.indice["esquema"]
+        self.taxa_amostragem = self.indice["taxa_amostragem"]
+
+        # Posição inicial (em amostras) de cada arquivo dentro da captura
+        tamanhos = [arquivo["amostras"] for arquivo in self.indice["arquivos"]]
+        self._inicios = np.concatenate([[0], np.cumsum(tamanhos, dtype=np.int64)])
+        self._mapas = [None] * len(tamanhos)
+
+    def __len__(self):
+        return int(self._inicios[-1])
+
+    def _mapa(self, i):
+        # Cada arquivo só é mapeado na primeira vez que é acessado
+        if self._mapas[i] is None:
+            arquivo = self.indice["arquivos"][i]
+            caminho = os.path.join(self.diretorio, arquivo["nome"])
+            self._mapas[i] = np.memmap(caminho, dtype=self.dtype, mode="r", shape=(arquivo["amostras"],))
+        return self._mapas[i]
+
+    def _pedacos(self, inicio, fim):
+        # Views dos arquivos que cobrem [inicio, fim)
+        primeiro = np.searchsorted(self._inicios, inicio, side="right") - 1
+        for i in range(max(primeiro, 0), len(self._mapas)):
+            if self._inicios[i] >= fim:
+                break
+            deslocamento = self._inicios[i]
+            yield self._mapa(i)[max(inicio - deslocamento, 0):fim - deslocamento]
+
+    def janela(self, inicio, fim):
+        """ Amostras de [inicio, fim); sem cópia quando a janela está dentro de um único arquivo """
+        fim = min(fim, len(self))
+        pedacos = list(self._pedacos(inicio, fim))
+        if len(pedacos) == 1:
+            return pedacos[0]
+        return np.concatenate(pedacos) if pedacos else np.zeros(0, dtype=self.dtype)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fim, passo = indice.indices(len(self))
+            if passo > 0:
+                return self.janela(inicio, max(inicio, fim))[::passo]
+            # Passo negativo: a janela vai de fim + 1 até inicio e é percorrida de trás para frente
+            return self.janela(fim + 1, max(fim + 1, inicio + 1))[::-1][::-passo]
+        if isinstance(indice, (int, np.integer)):
+            posicao = indice + len(self) if indice < 0 else indice
+            if not 0 <= posicao < len(self):
+                raise IndexError("Índice fora da captura")
+            return self.janela(posicao, posicao + 1)[0]
+        raise TypeError(f"Índices da captura devem ser inteiros ou fatias, não {type(indice).__name__}")
+
+    @property
+    def num_quadros(self):
+        return len(self.indice["quadros"])
+
+    def quadro(self, i):
+        quadro = self.indice["quadros"][i]
+        return self.janela(quadro["inicio"], quadro["inicio"] + quadro["amostras"])
+
+    def blocos(self, tamanho_bloco=1 << 20, inicio=0, fim=None):
+        """ Percorre a captura em blocos de até tamanho_bloco amostras (views dos arquivos mapeados) """
+        fim = len(self) if fim is None else fim
+        for pedaco in self._pedacos(inicio, fim):
+            for posicao in range(0, len(pedaco), tamanho_bloco):
+                yield pedaco[posicao:posicao + tamanho_bloco]
+
+    def modulador(self):
+        """ Modulador configurado como o que gerou a captura """
+        if self.esquema in ModulacaoDigital.ESQUEMAS:
+            return ModulacaoDigital(taxa_amostragem=self.taxa_amostragem, amplitude=self.indice["amplitude"])
+        # Com o mesmo dtype, amostras int16 são interpretadas como o ponto fixo do modulador
+        return ModulacaoPortadora(taxa_amostragem=self.taxa_amostragem, amplitude=self.indice["amplitude"],
+                                  dtype=self.dtype)
+
+    def demodular(self, tamanho_bloco=1 << 20, inicio=0, fim=None):
+        """ Passa a captura pelo demodulador em fluxo, bloco a bloco, gerando os bits """
+        modulador = self.modulador()
+        blocos = self.blocos(tamanho_bloco, inicio, fim)
+        if isinstance(modulador, ModulacaoDigital):
+            yield from modulador.demodular_stream(self.esquema, blocos)
+        else:
+            yield from modulador.demodular_stream(self.esquema, blocos, **self.indice["parametros"])
+
+    def demodular_quadro(self, i):
+        quadro = self.indice["quadros"][i]
+        bits = list(self.demodular(inicio=quadro["inicio"], fim=quadro["inicio"] + quadro["amostras"]))
+        return np.concatenate(bits) if bits else np.zeros(0, dtype=np.int8)
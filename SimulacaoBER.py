@@ -0,0 +1,105 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from CamadaFisica import ModulacaoDigital, ModulacaoPortadora
+
+ESQUEMAS_DIGITAIS = ModulacaoDigital.ESQUEMAS
+
+# Moduladores já criados em cada processo, para reaproveitar as tabelas em cache entre lotes
+_moduladores = {}
+
+
+def _modulador(esquema, taxa_amostragem, amplitude):
+    chave = (esquema in ESQUEMAS_DIGITAIS, taxa_amostragem, amplitude)
+    modulador = _moduladores.get(chave)
+    if modulador is None:
+        classe = ModulacaoDigital if chave[0] else ModulacaoPortadora
+        modulador = classe(taxa_amostragem=taxa_amostragem, amplitude=amplitude)
+        _moduladores[chave] = modulador
+    return modulador
+
+
+def simular_lote(configuracao, ebn0_db, semente, num_bits):
+    """ Transmite um lote de bits aleatórios por um canal AWGN e conta os erros """
+    esquema, taxa_amostragem, amplitude, parametros = configuracao
+    modulador = _modulador(esquema, taxa_amostragem, amplitude)
+    rng = np.random.default_rng(semente)
+
+    bits = rng.integers(0, 2, num_bits, dtype=np.int8)
+    _, sinal = modulador.modular(esquema, bits, **parametros)
+
+    # Energia por bit medida no próprio sinal; cada amostra recebe ruído de variância N0/2
+    energia_bit = np.dot(sinal, sinal) / num_bits
+    n0 = energia_bit / 10 ** (ebn0_db / 10)
+    recebido = sinal + rng.normal(0.0, np.sqrt(n0 / 2), len(sinal))
+
+    bits_recebidos = np.asarray(modulador.demodular(esquema, recebido, **parametros))[:num_bits]
+    return int(np.count_nonzero(bits_recebidos != bits)), num_bits
+
+
+class ResultadoBER:
+    """ Curva BER x Eb/N0 de um esquema """
+    def __init__(self, esquema, ebn0_db, erros, bits):
+        self.esquema = esquema
+        self.ebn0_db = np.asarray(ebn0_db, dtype=np.float64)
+        self.erros = np.asarray(erros, dtype=np.int64)
+        self.bits = np.asarray(bits, dtype=np.int64)
+
+    @property
+    def ber(self):
+        return self.erros / np.maximum(self.bits, 1)
+
+    def como_arrays(self):
+        return {"ebn0_db": self.ebn0_db, "erros": self.erros, "bits": self.bits, "ber": self.ber}
+
+    def salvar_csv(self, caminho):
+        with open(caminho, "w", newline="") as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(["esquema", "ebn0_db", "erros", "bits", "ber"])
+            for linha in zip(self.ebn0_db, self.erros, self.bits, self.ber):
+                escritor.writerow([self.esquema, *linha])
+
+
+class SimuladorBER:
+    """ Simulação Monte-Carlo da taxa de erro de bit de um esquema da CamadaFisica sob ruído AWGN """
+    def __init__(self, esquema, taxa_amostragem=8, amplitude=1, processos=None, bits_por_lote=1 << 18,
+                 **parametros):
+        self.configuracao = (esquema, taxa_amostragem, amplitude, parametros)
+        self.processos = processos or os.cpu_count() or 1
+        self.bits_por_lote = bits_por_lote
+
+    def executar(self, ebn0_db, alvo_erros=100, max_bits=10 ** 7, semente=None):
+        """ Simula cada ponto de Eb/N0 até atingir alvo_erros ou max_bits """
+        # Cada lote recebe um fluxo aleatório independente derivado da mesma semente
+        sementes = np.random.SeedSequence(semente)
+        erros_por_ponto, bits_por_ponto = [], []
+
+        with ProcessPoolExecutor(max_workers=self.processos) as executor:
+            for ebn0 in ebn0_db:
+                erros, bits = 0, 0
+                # Lotes são enviados em ondas de um por processo; o ponto para assim que atinge o alvo
+                while erros < alvo_erros and bits < max_bits:
+                    tamanhos, faltam = [], max_bits - bits
+                    while faltam > 0 and len(tamanhos) < self.processos:
+                        tamanhos.append(min(self.bits_por_lote, faltam))
+                        faltam -= tamanhos[-1]
+                    onda = [executor.submit(simular_lote, self.configuracao, ebn0, filho, tamanho)
+                            for filho, tamanho in zip(sementes.spawn(len(tamanhos)), tamanhos)]
+                    for futuro in onda:
+                        erros_lote, bits_lote = futuro.result()
+                        erros += erros_lote
+                        bits += bits_lote
+                erros_por_ponto.append(erros)
+                bits_por_ponto.append(bits)
+
+        return ResultadoBER(self.configuracao[0], ebn0_db, erros_por_ponto, bits_por_ponto)
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    for esquema in ESQUEMAS_DIGITAIS + ("ASK", "FSK", "8-QAM"):
+        resultado = SimuladorBER(esquema).executar(np.arange(0, 11, 2), alvo_erros=200, max_bits=10 ** 6)
+        print(esquema, "BER:", resultado.ber)
@@ -0,0 +1,165 @@
+import argparse
+import json
+import sys
+import os
+import time
+import tracemalloc
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from CamadaFisica import Constelacao, ModulacaoDigital, ModulacaoOFDM, ModulacaoPortadora
+
+# Todos os esquemas das classes, para nenhum modulador ou demodulador ficar fora
+ESQUEMAS_DIGITAIS = ModulacaoDigital.ESQUEMAS
+ESQUEMAS_PORTADORA = ModulacaoPortadora.ESQUEMAS
+# No OFDM as amostras por símbolo vêm do tamanho da FFT, então a taxa de amostragem não se aplica
+ESQUEMAS_OFDM = tuple(f"OFDM-{constelacao}" for constelacao in Constelacao.TIPOS)
+
+DTYPES_DIGITAIS = ["int64", "int8"]
+DTYPES_PORTADORA = ["float64", "float32", "int16"]
+DTYPES_OFDM = ["float64", "float32"]
+
+
+def criar_modulador(esquema, taxa_amostragem, dtype):
+    """ Funções de modulação e demodulação do esquema, com a mesma assinatura para todas as classes """
+    if esquema in ESQUEMAS_OFDM:
+        ofdm = ModulacaoOFDM(constelacao=esquema[len("OFDM-"):], dtype=dtype)
+        return ofdm.modular, ofdm.demodular
+    if esquema in ESQUEMAS_DIGITAIS:
+        modulador = ModulacaoDigital(taxa_amostragem=taxa_amostragem, dtype=dtype)
+    else:
+        modulador = ModulacaoPortadora(taxa_amostragem=taxa_amostragem, dtype=dtype)
+    return (lambda bits: modulador.modular(esquema, bits)), (lambda sinal: modulador.demodular(esquema, sinal))
+
+
+def medir(funcao, repeticoes):
+    """ Menor tempo entre as repetições e pico de memória alocada numa execução separada """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    # O tracemalloc deixa a execução mais lenta, por isso a memória é medida à parte
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico
+
+
+def amostras_por_bit(esquema, taxa):
+    if esquema in ESQUEMAS_OFDM:
+        ofdm = ModulacaoOFDM(constelacao=esquema[len("OFDM-"):])
+        return ofdm.amostras_por_simbolo / ofdm.bits_por_simbolo
+    return taxa
+
+
+def casos(tamanhos, taxas, max_amostras):
+    """ Casos a medir e casos pulados por terem mais amostras que `max_amostras` """
+    medidos, pulados = [], []
+    for esquema in ESQUEMAS_DIGITAIS + ESQUEMAS_PORTADORA + ESQUEMAS_OFDM:
+        if esquema in ESQUEMAS_OFDM:
+            dtypes, taxas_esquema = DTYPES_OFDM, [None]
+        else:
+            dtypes = DTYPES_DIGITAIS if esquema in ESQUEMAS_DIGITAIS else DTYPES_PORTADORA
+            taxas_esquema = taxas
+        for dtype in dtypes:
+            for taxa in taxas_esquema:
+                for num_bits in tamanhos:
+                    # Casos grandes demais para a memória da máquina são pulados, mas ficam registrados
+                    caso = (esquema, dtype, taxa, num_bits)
+                    if num_bits * amostras_por_bit(esquema, taxa) <= max_amostras:
+                        medidos.append(caso)
+                    else:
+                        pulados.append(caso)
+    return medidos, pulados
+
+
+def nome_caso(esquema, operacao, dtype, taxa, num_bits):
+    taxa = "" if taxa is None else f"/taxa={taxa}"
+    return f"{esquema}/{operacao}/{dtype}{taxa}/bits={num_bits}"
+
+
+def executar(tamanhos, taxas, max_amostras, repeticoes):
+    rng = np.random.default_rng(0)
+    resultados = {}
+    medidos, pulados = casos(tamanhos, taxas, max_amostras)
+    for esquema, dtype, taxa, num_bits in medidos:
+        modular, demodular = criar_modulador(esquema, taxa, dtype)
+        bits = rng.integers(0, 2, num_bits, dtype=np.int8)
+        # Aquece o cache de tabelas antes de medir
+        _, sinal = modular(bits)
+
+        for operacao, funcao in (("modular", lambda: modular(bits)),
+                                 ("demodular", lambda: demodular(sinal))):
+            segundos, pico = medir(funcao, repeticoes)
+            chave = nome_caso(esquema, operacao, dtype, taxa, num_bits)
+            resultados[chave] = {
+                "esquema": esquema,
+                "operacao": operacao,
+                "dtype": dtype,
+                "taxa_amostragem": taxa,
+                "bits": num_bits,
+                "segundos": segundos,
+                "bits_por_s": num_bits / segundos,
+                "amostras_por_s": len(sinal) / segundos,
+                "pico_memoria_bytes": pico,
+            }
+            print(f"{chave:55s} {num_bits / segundos:14.4g} bits/s {pico / 2**20:10.1f} MiB")
+
+    pulados = [nome_caso(esquema, "*", dtype, taxa, num_bits) for esquema, dtype, taxa, num_bits in pulados]
+    if pulados:
+        print(f"{len(pulados)} casos pulados (mais de {max_amostras:.4g} amostras):")
+        for chave in pulados:
+            print(f"  {chave}")
+    return resultados, pulados
+
+
+def comparar(resultados, baseline, margem):
+    """ Lista os casos cuja vazão caiu mais que `margem` (fração) em relação ao baseline """
+    regressoes = []
+    for chave, referencia in baseline.items():
+        atual = resultados.get(chave)
+        if atual is None:
+            continue
+        limite = referencia["bits_por_s"] * (1 - margem)
+        if atual["bits_por_s"] < limite:
+            regressoes.append((chave, referencia["bits_por_s"], atual["bits_por_s"]))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da camada física")
+    parser.add_argument("--tamanhos", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6, 1e7],
+                        help="Tamanhos das mensagens em bits")
+    parser.add_argument("--taxas", type=int, nargs="+", default=[8, 100, 1000],
+                        help="Amostras por símbolo")
+    parser.add_argument("--max-amostras", type=float, default=1e8,
+                        help="Pula casos com mais amostras que isso")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--saida", default="benchmark_fisica.json", help="Arquivo JSON com os resultados")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--margem", type=float, default=0.2,
+                        help="Queda de vazão tolerada em relação ao baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    resultados, pulados = executar([int(t) for t in args.tamanhos], args.taxas, args.max_amostras,
+                                   args.repeticoes)
+    with open(args.saida, "w") as arquivo:
+        json.dump({"resultados": resultados, "pulados": pulados}, arquivo, indent=2)
+    print(f"Resultados salvos em {args.saida}")
+
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            baseline = json.load(arquivo)["resultados"]
+        regressoes = comparar(resultados, baseline, args.margem)
+        for chave, antes, depois in regressoes:
+            print(f"REGRESSÃO {chave}: {antes:.4g} -> {depois:.4g} bits/s")
+        if regressoes:
+            return 1
+        print("Nenhuma regressão em relação ao baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
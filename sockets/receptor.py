@@ -7,6 +7,7 @@ import numpy as np
 import socket
 import threading
 import json
+from visualizacao import PainelSinais
 
 class ReceptorGUI:
     def __init__(self):
@@ -96,6 +97,9 @@ class ReceptorGUI:
         # Adiciona o canvas para exibir os gráficos na interface GTK
         canvas = FigureCanvas(self.fig)
         frame.add(canvas)
+
+        # Linhas persistentes, atualizadas por blitting a cada recepção
+        self.painel = PainelSinais(self.fig, (self.ax1, self.ax2), ("steps-pre", "default"))
         
         self.main_box.pack_start(frame, True, True, 0)
 
@@ -180,15 +184,6 @@ class ReceptorGUI:
             bits = [int(b) for byte in texto.encode('utf-8') for b in format(byte, '08b')]
             t = np.linspace(0, len(bits), len(bits))
             
-            # Limpa os gráficos
-            self.ax1.clear()
-            self.ax2.clear()
-            
-            # Plota sinal digital
-            self.ax1.step(t, bits)
-            self.ax1.set_title(f"Sinal Digital Recebido ({mod_digital})")
-            self.ax1.grid(True)
-            
             # Simula sinal modulado (exemplo simplificado)
             if mod_portadora == "ASK":
                 # Amplitude Shift Keying
@@ -208,11 +203,11 @@ class ReceptorGUI:
                 t_dense = np.linspace(0, len(bits), len(bits) * 20)
                 signal = np.sin(2 * np.pi * 10 * t_dense) * np.repeat(bits, 20)
             
-            self.ax2.plot(t_dense, signal)
-            self.ax2.set_title(f"Sinal Modulado Recebido ({mod_portadora})")
-            self.ax2.grid(True)
-            
-            self.fig.canvas.draw()
+            # Atualiza os gráficos (reduzidos a ~2 pontos por pixel)
+            self.painel.atualizar([
+                (t, bits, f"Sinal Digital Recebido ({mod_digital})"),
+                (t_dense, signal, f"Sinal Modulado Recebido ({mod_portadora})"),
+            ])
             
         GLib.idle_add(update)
 
@@ -11,8 +11,20 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from CamadaFisica import *
+from visualizacao import EnvelopeEmFluxo, PainelSinais, largura_em_pixels
+
+
+class TrabalhoCancelado(Exception):
+    """Uma nova transmissão substituiu o trabalho em andamento."""
+
 
 class TransmissorGUI:
+    # Mensagens com mais bits que isso mostram a barra de progresso
+    BITS_PARA_PROGRESSO = 1 << 16
+
+    # Amostras geradas por vez no trabalho em segundo plano (~2 MB em float64)
+    AMOSTRAS_POR_BLOCO = 1 << 18
+
     def __init__(self):
         #TODO: descomentar quando implementar a modulação
         
@@ -28,6 +40,10 @@ class TransmissorGUI:
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.connected = False
 
+        # Identificador do trabalho de modulação mais recente; trabalhos antigos são cancelados
+        self.trabalho_atual = 0
+        self.lock_trabalho = threading.Lock()
+
         # Layout principal
         self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
         self.window.add(self.main_box)
@@ -87,6 +103,12 @@ class TransmissorGUI:
         self.btn_transmitir.set_sensitive(False)
         bbox.add(self.btn_transmitir)
         
+        # Progresso da modulação de mensagens grandes
+        self.barra_progresso = Gtk.ProgressBar()
+        self.barra_progresso.set_show_text(True)
+        self.barra_progresso.set_no_show_all(True)
+        box.pack_start(self.barra_progresso, False, False, 0)
+
         box.pack_start(bbox, False, False, 0)
         frame.set_vexpand(False)  # Entrada de dados não cresce verticalmente
         self.main_box.pack_start(frame, False, False, 0)
@@ -134,6 +156,9 @@ class TransmissorGUI:
         # Adiciona o canvas para exibir os gráficos na interface GTK
         canvas = FigureCanvas(self.fig)
         frame.add(canvas)
+
+        # Linhas persistentes, atualizadas por blitting a cada transmissão
+        self.painel = PainelSinais(self.fig, (self.ax1, self.ax2), ("steps-post", "steps-post"))
         
         self.main_box.pack_start(frame, True, True, 0)
 
@@ -217,44 +242,89 @@ class TransmissorGUI:
             # Envia os dados
             self.socket.sendall(json.dumps(dados).encode('utf-8'))
             
-            # Gera bits a partir do texto
-            bits = [int(b) for byte in texto.encode('utf-8') for b in format(byte, '08b')]
-            
-            # Aplica modulação digital selecionada
-            if mod_digital == "NRZ-Polar":
-                tempo, sinal = self.mod_digital.nrz_polar(bits)
-            elif mod_digital == "Manchester":
-                tempo, sinal = self.mod_digital.manchester(bits)
-            else:  # Bipolar
-                tempo, sinal = self.mod_digital.bipolar(bits)
+            # Modulação e preparo dos gráficos rodam fora da thread da interface.
+            # Um novo clique cancela o trabalho anterior que ainda não terminou
+            with self.lock_trabalho:
+                self.trabalho_atual += 1
+                trabalho = self.trabalho_atual
+            larguras = (largura_em_pixels(self.ax1), largura_em_pixels(self.ax2))
+            threading.Thread(target=self.modular_em_segundo_plano,
+                             args=(trabalho, texto, mod_digital, mod_portadora, larguras),
+                             daemon=True).start()
             
-            # Atualiza o gráfico do sinal digital
-            self.ax1.clear()
-            self.ax1.step(tempo, sinal, where='post')
-            self.ax1.set_title(f"Sinal Digital ({mod_digital})")
-            self.ax1.grid(True)
+        except Exception as e:
+            self.adicionar_log(f"Erro na transmissão: {str(e)}")
 
-            # Aplica a modulação da portadora
-            if mod_portadora == "ASK":
-                tempo_carrier, sinal_carrier = self.mod_portadora.ask(bits)
-            elif mod_portadora == "FSK":
-                tempo_carrier, sinal_carrier = self.mod_portadora.fsk(bits)
-            else:  # 8-QAM
-                tempo_carrier, sinal_carrier = self.mod_portadora.qam8(bits)
-            
-            # Atualiza o gráfico da portadora
-            self.ax2.clear()
-            self.ax2.step(tempo_carrier, sinal_carrier, where='post')
-            self.ax2.set_title(f"Sinal da Portadora ({mod_portadora})")
-            self.ax2.grid(True)
 
-            # Redesenha o canvas
-            self.fig.canvas.draw()
-            self.adicionar_log(f"Dados transmitidos usando {mod_digital} e {mod_portadora}")
-            
+    def cancelado(self, trabalho):
+        with self.lock_trabalho:
+            return trabalho != self.trabalho_atual
+
+    def modular_em_segundo_plano(self, trabalho, texto, mod_digital, mod_portadora, larguras):
+        """Converte o texto em bits, modula e reduz os sinais para o gráfico (executa numa thread)."""
+        try:
+            # Gera bits a partir do texto
+            bits = np.unpackbits(np.frombuffer(texto.encode('utf-8'), dtype=np.uint8))
+            mostrar_progresso = len(bits) > self.BITS_PARA_PROGRESSO
+
+            # As duas modulações são feitas em blocos, para acompanhar o progresso e poder cancelar.
+            # O bloco é medido em amostras: a quantidade de bits depende das amostras por bit de cada modulador
+            def blocos_bits(etapa, taxa_amostragem):
+                bits_por_bloco = max(1, self.AMOSTRAS_POR_BLOCO // taxa_amostragem)
+                num_blocos = max(-(-len(bits) // bits_por_bloco), 1)
+                for i in range(num_blocos):
+                    if self.cancelado(trabalho):
+                        raise TrabalhoCancelado()
+                    if mostrar_progresso:
+                        GLib.idle_add(self.atualizar_progresso, trabalho, (etapa + i / num_blocos) / 2)
+                    yield bits[i * bits_por_bloco:(i + 1) * bits_por_bloco]
+
+            # Cada bloco modulado é reduzido ao envelope assim que chega; o sinal inteiro nunca é montado
+            envelope = EnvelopeEmFluxo(larguras[0], 1 / self.mod_digital.taxa_amostragem)
+            for bloco in self.mod_digital.modular_stream(
+                    mod_digital, blocos_bits(0, self.mod_digital.taxa_amostragem)):
+                envelope.adicionar(bloco)
+            digital = envelope.resultado()
+
+            # Tempo em símbolos da portadora
+            envelope = EnvelopeEmFluxo(larguras[1], 1 / self.mod_portadora.taxa_amostragem)
+            for bloco in self.mod_portadora.modular_stream(
+                    mod_portadora, blocos_bits(1, self.mod_portadora.taxa_amostragem)):
+                envelope.adicionar(bloco)
+            portadora = envelope.resultado()
+        except TrabalhoCancelado:
+            return
         except Exception as e:
             self.adicionar_log(f"Erro na transmissão: {str(e)}")
+            GLib.idle_add(self.atualizar_progresso, trabalho, None)
+            return
 
+        GLib.idle_add(self.mostrar_resultado, trabalho, mod_digital, mod_portadora, digital, portadora)
+
+    def atualizar_progresso(self, trabalho, fracao):
+        """Atualiza a barra de progresso (None esconde a barra); roda na thread da interface."""
+        if not self.cancelado(trabalho):
+            if fracao is None:
+                self.barra_progresso.hide()
+            else:
+                self.barra_progresso.set_fraction(fracao)
+                self.barra_progresso.set_text(f"Modulando... {fracao:.0%}")
+                self.barra_progresso.show()
+        return False
+
+    def mostrar_resultado(self, trabalho, mod_digital, mod_portadora, digital, portadora):
+        """Mostra os sinais de um trabalho concluído, se ele ainda for o mais recente."""
+        if self.cancelado(trabalho):
+            return False
+        self.barra_progresso.hide()
+
+        # Atualiza os gráficos (já reduzidos a ~2 pontos por pixel)
+        self.painel.atualizar([
+            (*digital, f"Sinal Digital ({mod_digital})"),
+            (*portadora, f"Sinal da Portadora ({mod_portadora})"),
+        ])
+        self.adicionar_log(f"Dados transmitidos usando {mod_digital} e {mod_portadora}")
+        return False
 
     """def on_transmitir_clicked(self, button):
         #Manipula o evento de clique no botão transmitir
@@ -0,0 +1,157 @@
+import numpy as np
+
+
+def largura_em_pixels(ax):
+    """Largura do eixo na tela, em pixels."""
+    return max(int(ax.get_window_extent().width), 1)
+
+
+def reduzir_para_plot(tempo, sinal, largura_px):
+    """Reduz o sinal a ~2 pontos por pixel, guardando o mínimo e o máximo de cada faixa.
+
+    Os picos continuam visíveis e o custo do plot não depende mais do tamanho da mensagem.
+    """
+    sinal = np.asarray(sinal)
+    tempo = np.asarray(tempo)
+    if len(sinal) <= 2 * largura_px:
+        return tempo, sinal
+
+    # Início de cada faixa de amostras (uma faixa por pixel)
+    inicios = np.linspace(0, len(sinal), largura_px, endpoint=False).astype(np.intp)
+    fins = np.append(inicios[1:], len(sinal)) - 1
+    minimos = np.minimum.reduceat(sinal, inicios)
+    maximos = np.maximum.reduceat(sinal, inicios)
+
+    # Em faixas que descem, o máximo vem antes do mínimo, para as bordas não se inverterem no desenho
+    descendo = sinal[inicios] > sinal[fins]
+    primeiro = np.where(descendo, maximos, minimos)
+    segundo = np.where(descendo, minimos, maximos)
+
+    sinal_reduzido = np.column_stack([primeiro, segundo]).reshape(-1)
+    tempo_reduzido = np.column_stack([tempo[inicios], tempo[fins]]).reshape(-1)
+    return tempo_reduzido, sinal_reduzido
+
+
+class EnvelopeEmFluxo:
+    """Reduz um sinal que chega em blocos ao envelope mínimo/máximo de reduzir_para_plot, sem guardar o sinal.
+
+    Cada faixa guarda só início, fim, mínimo, máximo e a primeira e a última amostra. Quando passam de
+    2 * largura_px faixas, as vizinhas são juntadas duas a duas e as próximas faixas dobram de tamanho,
+    então a memória não depende do tamanho do sinal (ficam de 1 a 2 faixas por pixel).
+    """
+
+    def __init__(self, largura_px, passo_tempo=1.0):
+        self.largura_px = largura_px
+        self.passo_tempo = passo_tempo  # Tempo entre duas amostras
+        self.amostras_por_faixa = 1
+        self.total = 0
+        self._faixas = np.zeros((6, 0))  # Linhas: início, fim (inclusive), mínimo, máximo, primeira, última
+        self._resto = np.zeros(0)
+
+    def adicionar(self, bloco):
+        bloco = np.concatenate([self._resto, np.asarray(bloco, dtype=np.float64)])
+        num_faixas = len(bloco) // self.amostras_por_faixa
+        completas = bloco[:num_faixas * self.amostras_por_faixa].reshape(num_faixas, self.amostras_por_faixa)
+        self._resto = bloco[num_faixas * self.amostras_por_faixa:]
+        self._acrescentar(completas)
+        while self._faixas.shape[1] > 2 * self.largura_px:
+            self._juntar_pares()
+
+    def _acrescentar(self, matriz):
+        if not len(matriz):
+            return
+        inicios = self.total + np.arange(len(matriz)) * matriz.shape[1]
+        faixas = np.stack([inicios, inicios + matriz.shape[1] - 1, matriz.min(axis=1), matriz.max(axis=1),
+                           matriz[:, 0], matriz[:, -1]])
+        self._faixas = np.hstack([self._faixas, faixas])
+        self.total += matriz.size
+
+    def _juntar_pares(self):
+        # Junta as faixas vizinhas duas a duas (uma faixa ímpar no fim fica como está)
+        pares = self._faixas.shape[1] // 2 * 2
+        esquerda, direita = self._faixas[:, 0:pares:2], self._faixas[:, 1:pares:2]
+        juntas = np.stack([esquerda[0], direita[1], np.minimum(esquerda[2], direita[2]),
+                           np.maximum(esquerda[3], direita[3]), esquerda[4], direita[5]])
+        self._faixas = np.hstack([juntas, self._faixas[:, pares:]])
+        self.amostras_por_faixa *= 2
+
+    def resultado(self):
+        """Devolve (tempo, sinal) reduzidos, incluindo as amostras de uma faixa incompleta no fim."""
+        resto, self._resto = self._resto, np.zeros(0)
+        self._acrescentar(resto[np.newaxis, :] if len(resto) else resto.reshape(0, 1))
+        inicios, fins, minimos, maximos, primeiras, ultimas = self._faixas
+        if np.array_equal(inicios, fins):
+            # Nenhuma faixa foi juntada: o sinal é pequeno e fica como está
+            return inicios * self.passo_tempo, primeiras
+
+        # Como em reduzir_para_plot, nas faixas que descem o máximo vem antes do mínimo
+        descendo = primeiras > ultimas
+        sinal = np.column_stack([np.where(descendo, maximos, minimos), np.where(descendo, minimos, maximos)])
+        tempo = np.column_stack([inicios, fins]) * self.passo_tempo
+        return tempo.reshape(-1), sinal.reshape(-1)
+
+
+class PainelSinais:
+    """Mantém uma linha persistente por eixo e atualiza a figura com blitting.
+
+    A figura inteira só é redesenhada (com draw_idle) quando os limites ou os títulos mudam;
+    nas outras atualizações, o fundo guardado é restaurado e só as linhas são desenhadas.
+    """
+
+    def __init__(self, fig, eixos, estilos):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.linhas = []
+        for ax, estilo in zip(eixos, estilos):
+            # Linhas animadas ficam fora do desenho normal e entram só pelo blit
+            linha, = ax.plot([], [], drawstyle=estilo, animated=True)
+            self.linhas.append(linha)
+        self._fundo = None
+        self.canvas.mpl_connect("draw_event", self._ao_desenhar)
+
+    def _ao_desenhar(self, evento):
+        # Depois de cada desenho completo (inclusive ao redimensionar), guarda o fundo sem as linhas
+        self._fundo = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._desenhar_linhas()
+
+    def _desenhar_linhas(self):
+        for linha in self.linhas:
+            linha.axes.draw_artist(linha)
+
+    def atualizar(self, dados):
+        """Recebe uma tupla (tempo, sinal, título) por eixo e redesenha o mínimo necessário."""
+        mudou = False
+        for linha, (tempo, sinal, titulo) in zip(self.linhas, dados):
+            ax = linha.axes
+            tempo, sinal = reduzir_para_plot(tempo, sinal, largura_em_pixels(ax))
+            linha.set_data(tempo, sinal)
+            mudou |= self._ajustar_eixo(ax, tempo, sinal, titulo)
+
+        if mudou or self._fundo is None:
+            self.canvas.draw_idle()
+        else:
+            self.canvas.restore_region(self._fundo)
+            self._desenhar_linhas()
+            self.canvas.blit(self.fig.bbox)
+
+    def _ajustar_eixo(self, ax, tempo, sinal, titulo):
+        # Ajusta limites e título; devolve True se algo mudou e o fundo precisa ser refeito
+        if len(sinal):
+            xlim = (float(tempo[0]), float(tempo[-1]) if tempo[-1] > tempo[0] else float(tempo[0]) + 1)
+            minimo, maximo = float(np.min(sinal)), float(np.max(sinal))
+            margem = 0.05 * (maximo - minimo) or 1.0
+            ylim = (minimo - margem, maximo + margem)
+        else:
+            xlim, ylim = (0.0, 1.0), (-1.0, 1.0)
+
+        mudou = False
+        if ax.get_xlim() != xlim:
+            ax.set_xlim(xlim)
+            mudou = True
+        if ax.get_ylim() != ylim:
+            ax.set_ylim(ylim)
+            mudou = True
+        if ax.get_title() != titulo:
+            ax.set_title(titulo)
+            mudou = True
+        return mudou